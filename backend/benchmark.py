@@ -0,0 +1,283 @@
+"""
+Benchmarks du générateur, du pathfinding, du solveur et du traitement des mouvements
+
+    python benchmark.py                  # mesurer et comparer à la baseline
+    python benchmark.py --save           # mesurer et enregistrer la baseline
+    python benchmark.py --quick          # moins d'itérations (CI)
+    python benchmark.py --only path      # seulement les benchmarks dont le nom commence par "path"
+
+Toutes les mesures sont "plus petit = meilleur" (secondes par opération, tentatives par niveau).
+Le script sort en erreur (code 1) si une mesure dépasse la baseline de plus de --threshold.
+La baseline dépend de la machine: l'enregistrer sur la machine qui fait la comparaison.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+# Le serveur est importé pour handle_move: pas de MongoDB pendant les benchmarks
+os.environ.setdefault("DATABASE_BACKEND", "memory")
+
+from level_generator import LevelGenerator
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+SEED = 1234
+
+
+def measure(fn: Callable[[], object], number: int, repeat: int = 3) -> float:
+    """Meilleur temps moyen par appel sur repeat séries de number appels (comme timeit)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+# ===== GÉNÉRATION =====
+def bench_generate_level(results: Dict, scale: float):
+    """generate_level à chaque difficulté: temps par niveau et tentatives en trop par niveau"""
+    count = max(2, int(20 * scale))
+
+    for difficulty in range(1, 11):
+        generator = LevelGenerator(grid_size=15, seed=SEED + difficulty)
+        seconds = measure(lambda: generator.generate_level(difficulty), count, repeat=1)
+        stats = generator.get_stats()
+
+        results[f"generate_level.d{difficulty}"] = {"value": seconds, "unit": "s"}
+        results[f"generate_level.d{difficulty}.retries"] = {
+            "value": (stats["attempts"] - stats["levels"]) / stats["levels"],
+            "unit": "retries",
+            "slack": 0.5
+        }
+
+
+def bench_generate_batch(results: Dict, scale: float):
+    """generate_batch (solveur compris) sur toutes les difficultés: temps par niveau"""
+    count = max(10, int(100 * scale))
+    generator = LevelGenerator(grid_size=15, seed=SEED)
+
+    def generate_all():
+        for difficulty in range(1, 11):
+            generator.generate_batch(count, difficulty)
+
+    results["generate_batch"] = {"value": measure(generate_all, 1) / (10 * count), "unit": "s"}
+
+
+# ===== PATHFINDING =====
+def worst_case_grids(size: int) -> Dict:
+    """Grilles où _path_exists explore le plus de cases"""
+    open_grid = np.zeros((size, size), dtype=np.int8)
+
+    # Serpentin: une ligne de murs sur deux, ouverte alternativement à droite et à gauche
+    serpentine = np.zeros((size, size), dtype=np.int8)
+    gap = 0
+    for i, y in enumerate(range(1, size - 1, 2)):
+        gap = size - 1 if i % 2 == 0 else 0
+        serpentine[y, :] = 1
+        serpentine[y, gap] = 0
+
+    # But emmuré: tout le reste de la grille est visité avant de conclure
+    walled = np.zeros((size, size), dtype=np.int8)
+    walled[size - 2, size - 2:] = 1
+    walled[size - 2:, size - 2] = 1
+
+    end = (size - 1, size - 1)
+    return {
+        "open": (open_grid, (0, 0), end),
+        # Le but est à l'opposé de la dernière ouverture: le chemin le plus long possible
+        "serpentine": (serpentine, (0, 0), (size - 1 - gap, size - 1)),
+        "unreachable": (walled, (0, 0), end)
+    }
+
+
+def bench_path_exists(results: Dict, scale: float):
+    generator = LevelGenerator(seed=SEED)
+    number = max(10, int(300 * scale))
+
+    for size in (15, 25):
+        for name, (grid, start, end) in worst_case_grids(size).items():
+            seconds = measure(lambda: generator._path_exists(grid, start, end), number)
+            results[f"path_exists.{name}.{size}"] = {"value": seconds, "unit": "s"}
+
+
+def bench_extract_features(results: Dict, scale: float):
+    generator = LevelGenerator(seed=SEED)
+    levels = [generator.generate_level(difficulty) for difficulty in range(1, 11)]
+    number = max(5, int(50 * scale))
+
+    def extract_all():
+        for level in levels:
+            generator._extract_features(level)
+
+    results["extract_features"] = {"value": measure(extract_all, number) / len(levels), "unit": "s"}
+
+
+def bench_solve(results: Dict, scale: float):
+    """solve_level sur des niveaux de toutes difficultés (distances + ordre des icy)"""
+    from solver import solve_level
+
+    generator = LevelGenerator(seed=SEED, moves_per_second=None)
+    levels = [generator.generate_level(difficulty) for difficulty in range(1, 11)]
+    number = max(5, int(50 * scale))
+
+    def solve_all():
+        for level in levels:
+            solve_level(level)
+
+    results["solve_level"] = {"value": measure(solve_all, number) / len(levels), "unit": "s"}
+
+
+def bench_dataset(results: Dict, scale: float):
+    """Débit de generate_dataset (secondes par niveau, écriture JSON comprise)"""
+    count = max(20, int(200 * scale))
+    generator = LevelGenerator(seed=SEED)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "dataset.json")
+        start = time.perf_counter()
+        generator.generate_dataset(count, output, seed=SEED, workers=1)
+        seconds = time.perf_counter() - start
+
+    results["generate_dataset"] = {"value": seconds / count, "unit": "s"}
+
+
+# ===== MOUVEMENTS =====
+class FakeWebSocket:
+    """Remplace GameConnection: les messages sont comptés, pas envoyés"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_json(self, message: Dict):
+        self.sent += 1
+
+
+def bench_handle_move(results: Dict, scale: float):
+    import websocket_server as server
+    from game_session import GameSession
+
+    size = 15
+    level = {
+        "grid": [[0] * size for _ in range(size)],
+        "player_pos": [size // 2, size // 2],
+        "goal_pos": [size - 1, size - 1],
+        "time_limit": 3600,
+        "total_icy": 0
+    }
+    number = max(500, int(20000 * scale))
+
+    async def run() -> float:
+        session = GameSession(username="bench")
+        session.load(level, 1)
+        server.game_clock.start_timer(session, session.time_left)
+        websocket = FakeWebSocket()
+
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for i in range(number):
+                await server.handle_move(websocket, session, "right" if i % 2 == 0 else "left", server.db)
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
+
+    results["handle_move"] = {"value": asyncio.run(run()), "unit": "s"}
+
+
+BENCHMARKS = {
+    "generate_level": bench_generate_level,
+    "generate_batch": bench_generate_batch,
+    "path_exists": bench_path_exists,
+    "extract_features": bench_extract_features,
+    "solve_level": bench_solve,
+    "generate_dataset": bench_dataset,
+    "handle_move": bench_handle_move
+}
+
+
+# ===== BASELINE =====
+def compare(results: Dict, baseline: Dict, threshold: float) -> list:
+    """Mesures qui dépassent baseline * (1 + threshold) (+ slack absolu éventuel)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = base["value"] * (1 + threshold) + result.get("slack", 0.0)
+        if result["value"] > limit:
+            regressions.append((name, base["value"], result["value"]))
+    return regressions
+
+
+def format_value(result: Dict) -> str:
+    if result["unit"] == "s":
+        value = result["value"]
+        if value < 1e-3:
+            return f"{value * 1e6:9.1f} µs"
+        return f"{value * 1e3:9.2f} ms"
+    return f"{result['value']:9.2f}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks PathMind")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="fichier de baseline JSON")
+    parser.add_argument("--save", action="store_true", help="enregistrer les mesures comme baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="régression tolérée (0.25 = 25%% plus lent)")
+    parser.add_argument("--quick", action="store_true", help="moins d'itérations")
+    parser.add_argument("--only", default=None, help="préfixe des benchmarks à lancer")
+    args = parser.parse_args()
+
+    scale = 0.2 if args.quick else 1.0
+    results: Dict = {}
+
+    for name, bench in BENCHMARKS.items():
+        if args.only and not name.startswith(args.only):
+            continue
+        print(f"⏱️  {name}...", file=sys.stderr)
+        bench(results, scale)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"\n{'benchmark':32} {'mesure':>12} {'baseline':>12} {'écart':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:32} {format_value(result):>12} {'-':>12} {'-':>8}")
+            continue
+        change = (result["value"] / base["value"] - 1) * 100 if base["value"] else 0.0
+        print(f"{name:32} {format_value(result):>12} {format_value(base):>12} {change:+7.1f}%")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline enregistrée: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\n⚠️ Pas de baseline ({args.baseline}): lancer avec --save pour en créer une")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%}:")
+        for name, before, after in regressions:
+            print(f"   {name}: {before:.6g} -> {after:.6g}")
+        return 1
+
+    print(f"\n✅ Aucune régression au-delà de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
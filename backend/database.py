@@ -1,12 +1,67 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional, List, Dict
-import hashlib
+from pymongo import UpdateOne
+from bson import Binary
+from array import array
+from itertools import chain
+from typing import AsyncIterator, Iterable, Optional, List, Dict
 import os
+import zlib
 from datetime import datetime
 
-class Database:
+from storage import LEVEL_FIELDS, Storage
+from event_log import get_logger
+
+log = get_logger("storage")
+
+
+GRID_ENCODINGS = ("array", "packed", "zlib")
+
+# Documents par aller-retour quand on parcourt les niveaux avec un curseur
+LEVEL_BATCH_SIZE = 200
+
+
+def encode_level(level: Dict, encoding: str = "array") -> Dict:
+    """
+    Document MongoDB d'un niveau
+    packed: grille en BinData d'octets int8 (ligne par ligne) + grid_shape [hauteur, largeur]
+    zlib: idem, compressé
+    """
+    if encoding == "array":
+        return level
+    
+    grid = level["grid"]
+    data = array("b", chain.from_iterable(grid)).tobytes()
+    if encoding == "zlib":
+        data = zlib.compress(data)
+    
+    document = dict(level)
+    document["grid"] = Binary(data)
+    document["grid_shape"] = [len(grid), len(grid[0]) if grid else 0]
+    document["grid_encoding"] = encoding
+    return document
+
+
+def decode_level(document: Dict) -> Dict:
+    """Inverse de encode_level: la grille redevient une liste de listes"""
+    encoding = document.pop("grid_encoding", "array")
+    if encoding == "array" or not isinstance(document.get("grid"), bytes):
+        document.pop("grid_shape", None)
+        return document
+    
+    data = bytes(document["grid"])
+    if encoding == "zlib":
+        data = zlib.decompress(data)
+    
+    height, width = document.pop("grid_shape")
+    cells = array("b", data).tolist()
+    document["grid"] = [cells[y * width:(y + 1) * width] for y in range(height)]
+    return document
+
+
+class Database(Storage):
     def __init__(self, mongo_uri: str = None):
         """
+        Backend MongoDB (Motor) de l'interface Storage
         Initialise la connexion MongoDB
         Par défaut, utilise localhost ou la variable d'environnement MONGO_URI
         """
@@ -19,7 +74,12 @@ class Database:
         self.levels = self.db["levels"]
         self.leaderboard = self.db["leaderboard"]
         
-        print(f"📦 Connexion MongoDB: {self.mongo_uri}")
+        # Stockage des grilles de niveaux: array (listes BSON), packed ou zlib
+        self.grid_encoding = os.getenv("LEVEL_GRID_ENCODING", "array")
+        if self.grid_encoding not in GRID_ENCODINGS:
+            raise ValueError(f"LEVEL_GRID_ENCODING inconnu: {self.grid_encoding} ({', '.join(GRID_ENCODINGS)})")
+        
+        log.info("storage_opened", "📦 Connexion MongoDB", backend="mongo", uri=self.mongo_uri)
     
     # ===== UTILISATEURS =====
     async def create_user(self, username: str, password: str) -> Dict:
@@ -91,6 +151,39 @@ class Database:
         )
         return result.modified_count > 0
     
+    async def apply_user_increments(self, increments: Dict[str, tuple]) -> int:
+        """
+        Appliquer en un seul aller-retour les $inc cumulés par joueur
+        increments: username -> (gold, niveaux terminés)
+        """
+        if not increments:
+            return 0
+        
+        operations = [
+            UpdateOne(
+                {"username": username},
+                {"$inc": {"total_gold": gold, "levels_completed": completed}}
+            )
+            for username, (gold, completed) in increments.items()
+        ]
+        result = await self.users.bulk_write(operations, ordered=False)
+        return result.modified_count
+    
+    async def get_user_stats(self, username: str) -> Optional[Dict]:
+        """Gold et niveaux terminés d'un joueur (None s'il n'existe pas)"""
+        user = await self.users.find_one(
+            {"username": username},
+            {"username": 1, "total_gold": 1, "levels_completed": 1}
+        )
+        if not user:
+            return None
+        
+        return {
+            "username": user["username"],
+            "total_gold": user.get("total_gold", 0),
+            "levels_completed": user.get("levels_completed", 0)
+        }
+    
     async def update_user_level(self, username: str, level: int) -> bool:
         """Mettre à jour le niveau actuel d'un utilisateur"""
         result = await self.users.update_one(
@@ -99,10 +192,6 @@ class Database:
         )
         return result.modified_count > 0
     
-    def _hash_password(self, password: str) -> str:
-        """Hash simple du mot de passe avec SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
-    
     # ===== LEADERBOARD =====
     async def get_leaderboard(self, limit: int = 50) -> List[Dict]:
         """Récupérer le classement des joueurs par gold"""
@@ -124,36 +213,57 @@ class Database:
     # ===== NIVEAUX =====
     async def save_level(self, level_data: Dict) -> bool:
         """Sauvegarder un niveau"""
-        level_num = level_data.get("level", 1)
+        return await self.save_levels([level_data]) == 1
+    
+    async def save_levels(self, levels: List[Dict]) -> int:
+        """Sauvegarder un lot de niveaux en un seul aller-retour (bulk upsert)"""
+        if not levels:
+            return 0
         
         # Upsert: mettre à jour si existe, sinon créer
-        result = await self.levels.update_one(
-            {"level": level_num},
-            {"$set": level_data},
-            upsert=True
-        )
+        update = {}
+        if self.grid_encoding == "array":
+            # Un niveau enregistré avant en binaire repasse en listes
+            update["$unset"] = {"grid_shape": "", "grid_encoding": ""}
         
-        return result.acknowledged
+        operations = [
+            UpdateOne(
+                {"level": level.get("level", 1)},
+                dict(update, **{"$set": encode_level(level, self.grid_encoding)}),
+                upsert=True
+            )
+            for level in levels
+        ]
+        result = await self.levels.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.matched_count
     
     async def get_level(self, level_num: int) -> Optional[Dict]:
         """Récupérer un niveau par son numéro"""
-        level = await self.levels.find_one({"level": level_num})
-        
-        if level:
-            level["_id"] = str(level["_id"])
-        
-        return level
+        level = await self.levels.find_one({"level": level_num}, {"_id": 0})
+        return decode_level(level) if level else None
     
     async def get_all_levels(self) -> List[Dict]:
         """Récupérer tous les niveaux"""
-        cursor = self.levels.find({}).sort("level", 1)
+        cursor = self.levels.find({}, {"_id": 0}).sort("level", 1)
+        return [decode_level(level) async for level in cursor]
+    
+    async def iter_levels(self, after: Optional[int] = None, limit: Optional[int] = None,
+                          fields: Optional[Iterable[str]] = None) -> AsyncIterator[Dict]:
+        """Parcourir les niveaux avec le curseur Motor (un lot en mémoire à la fois)"""
+        query = {} if after is None else {"level": {"$gt": after}}
         
-        levels = []
-        async for level in cursor:
-            level["_id"] = str(level["_id"])
-            levels.append(level)
+        projection = {"_id": 0}
+        if fields is not None:
+            projection.update({field: 1 for field in fields if field in LEVEL_FIELDS}, level=1)
+            if "grid" in projection:
+                projection.update(grid_shape=1, grid_encoding=1)
         
-        return levels
+        cursor = self.levels.find(query, projection).sort("level", 1).batch_size(LEVEL_BATCH_SIZE)
+        if limit:
+            cursor = cursor.limit(limit)
+        
+        async for level in cursor:
+            yield decode_level(level)
     
     async def delete_all_levels(self) -> int:
         """Supprimer tous les niveaux (pour régénération)"""
@@ -166,12 +276,12 @@ class Database:
         await self.users.create_index("username", unique=True)
         await self.users.create_index("total_gold")
         await self.levels.create_index("level", unique=True)
-        print("✅ Index MongoDB créés")
+        log.info("storage_indexes", "✅ Index MongoDB créés", backend="mongo")
     
     async def close(self):
         """Fermer la connexion"""
         self.client.close()
-        print("👋 Connexion MongoDB fermée")
+        log.info("storage_closed", "👋 Connexion MongoDB fermée", backend="mongo")
 
 
 # ===== TEST =====
@@ -0,0 +1,291 @@
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+
+# ===== NDJSON (un niveau par ligne) =====
+def write_ndjson(levels: Iterable[Dict], filename: str, chunk_size: int = 100,
+                 append: bool = False) -> int:
+    """
+    Écrire des niveaux en NDJSON au fil de l'eau
+    Les lignes sont écrites par paquets de chunk_size puis flushées:
+    la mémoire reste constante et le fichier est exploitable à tout moment
+    """
+    written = 0
+    levels = iter(levels)
+
+    with open(filename, 'a' if append else 'w', encoding='utf-8') as f:
+        while True:
+            chunk = list(islice(levels, chunk_size))
+            if not chunk:
+                break
+
+            f.write("".join(json.dumps(level, separators=(',', ':')) + "\n" for level in chunk))
+            f.flush()
+            os.fsync(f.fileno())
+            written += len(chunk)
+
+    return written
+
+
+def iter_ndjson(filename: str, start: int = 0) -> Iterator[Dict]:
+    """
+    Lire un fichier NDJSON niveau par niveau
+    Les start premières lignes sont sautées sans être décodées
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in islice(f, start, None):
+            if line.endswith("\n"):
+                yield json.loads(line)
+
+
+def count_ndjson(filename: str, repair: bool = True) -> int:
+    """
+    Compter les niveaux complets d'un fichier NDJSON
+    Avec repair, une dernière ligne tronquée (crash pendant l'écriture) est supprimée
+    pour que l'écriture puisse reprendre proprement à la suite
+    """
+    if not os.path.exists(filename):
+        return 0
+
+    count = 0
+    end_of_last_line = 0
+    with open(filename, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            count += 1
+            end_of_last_line += len(line)
+
+    if repair and end_of_last_line < os.path.getsize(filename):
+        with open(filename, 'r+b') as f:
+            f.truncate(end_of_last_line)
+
+    return count
+
+
+# ===== FORMAT BINAIRE (np.memmap) =====
+# Un dossier par dataset: meta.json + un fichier brut par tableau, une ligne par niveau
+# Les grilles (valeurs -3..6) sont en int8, complétées à MAX_GRID_SIZE x MAX_GRID_SIZE
+MAX_GRID_SIZE = 25
+
+# Largeur fixe des listes de cristaux (positions inutilisées = -1)
+MAX_CRYSTALS = {"crystals_icy": 5, "crystals_gold": 3, "crystals_red": 3}
+
+# Colonnes entières par niveau (min_moves = -1: niveau non résolu, voir solver)
+INFO_COLUMNS = ["level", "difficulty", "grid_size", "time_limit", "dataset_index",
+                "num_icy", "num_gold", "num_red", "min_moves"]
+
+# Colonnes de _extract_features, dans cet ordre (NaN = None)
+FEATURE_COLUMNS = ["grid_size", "num_obstacles_small", "num_obstacles_2x1", "num_obstacles_2x2",
+                   "total_obstacles", "num_crystals_icy", "num_crystals_gold", "num_crystals_red",
+                   "time_limit", "manhattan_distance", "free_space_ratio", "difficulty", "min_moves"]
+
+# Valeur de min_moves pour un niveau non résolu
+NO_SOLUTION = -1
+
+BINARY_ARRAYS = {
+    "grids": (np.int8, (MAX_GRID_SIZE, MAX_GRID_SIZE)),
+    "positions": (np.int8, (2, 2)),
+    "crystals_icy": (np.int8, (MAX_CRYSTALS["crystals_icy"], 2)),
+    "crystals_gold": (np.int8, (MAX_CRYSTALS["crystals_gold"], 2)),
+    "crystals_red": (np.int8, (MAX_CRYSTALS["crystals_red"], 2)),
+    "info": (np.int32, (len(INFO_COLUMNS),)),
+    "features": (np.float32, (len(FEATURE_COLUMNS),)),
+    "min_time": (np.float32, ()),   # NaN: niveau non résolu
+}
+
+
+def write_binary_dataset(levels: Iterable[Dict], path: str, chunk_size: int = 1024,
+                         append: bool = False) -> int:
+    """
+    Écrire des niveaux au format binaire, par paquets de chunk_size
+    meta.json est mis à jour après chaque paquet: le dossier reste lisible en cours d'écriture
+    """
+    os.makedirs(path, exist_ok=True)
+    count = _read_binary_meta(path)["count"] if append else 0
+    mode = 'ab' if append else 'wb'
+    files = {name: open(os.path.join(path, f"{name}.bin"), mode) for name in BINARY_ARRAYS}
+    written = 0
+    levels = iter(levels)
+
+    try:
+        while True:
+            chunk = list(islice(levels, chunk_size))
+            if not chunk:
+                break
+
+            for name, array in _pack_levels(chunk).items():
+                files[name].write(array.tobytes())
+                files[name].flush()
+
+            written += len(chunk)
+            _write_binary_meta(path, count + written)
+    finally:
+        for f in files.values():
+            f.close()
+
+    if not written:
+        _write_binary_meta(path, count)
+    return written
+
+
+def _pack_levels(levels: List[Dict]) -> Dict[str, np.ndarray]:
+    """Convertir une liste de niveaux en tableaux de largeur fixe"""
+    n = len(levels)
+    arrays = {name: np.zeros((n,) + shape, dtype=dtype) for name, (dtype, shape) in BINARY_ARRAYS.items()}
+    for name in MAX_CRYSTALS:
+        arrays[name].fill(-1)
+
+    for i, level in enumerate(levels):
+        grid = np.asarray(level["grid"], dtype=np.int8)
+        size = grid.shape[0]
+        if size > MAX_GRID_SIZE:
+            raise ValueError(f"Grille {size}x{size} trop grande pour le format binaire (max {MAX_GRID_SIZE})")
+        arrays["grids"][i, :size, :size] = grid
+        arrays["positions"][i] = [level["player_pos"], level["goal_pos"]]
+
+        counts = []
+        for name, width in MAX_CRYSTALS.items():
+            crystals = level.get(name, [])
+            if len(crystals) > width:
+                raise ValueError(f"{len(crystals)} {name} pour un maximum de {width}")
+            if crystals:
+                arrays[name][i, :len(crystals)] = crystals
+            counts.append(len(crystals))
+
+        min_moves = level.get("min_moves")
+        arrays["info"][i] = [level.get("level", 1), level.get("difficulty", 0), size,
+                             level.get("time_limit", 0), level.get("dataset_index", -1)] + counts + [
+                             NO_SOLUTION if min_moves is None else min_moves]
+        min_time = level.get("min_time")
+        arrays["min_time"][i] = np.nan if min_time is None else min_time
+
+        features = level.get("features")
+        if features:
+            arrays["features"][i] = [np.nan if features.get(column) is None else features[column]
+                                     for column in FEATURE_COLUMNS]
+        else:
+            arrays["features"][i] = np.nan
+
+    return arrays
+
+
+def _write_binary_meta(path: str, count: int):
+    meta = {
+        "version": 2,
+        "count": count,
+        "max_grid_size": MAX_GRID_SIZE,
+        "info_columns": INFO_COLUMNS,
+        "feature_columns": FEATURE_COLUMNS,
+        "arrays": {name: {"dtype": np.dtype(dtype).str, "shape": list(shape)}
+                   for name, (dtype, shape) in BINARY_ARRAYS.items()},
+    }
+    tmp = os.path.join(path, "meta.json.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+def _read_binary_meta(path: str) -> Dict:
+    with open(os.path.join(path, "meta.json"), 'r') as f:
+        return json.load(f)
+
+
+class BinaryDataset:
+    """
+    Lecture d'un dataset binaire via np.memmap (aucune copie, aucun parsing)
+    Les tableaux complets (grids, features, ...) se découpent comme des ndarray
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta = _read_binary_meta(path)
+        self.count = self.meta["count"]
+        self.info_columns = self.meta["info_columns"]
+        self.feature_columns = self.meta["feature_columns"]
+
+        self.arrays = {}
+        for name, spec in self.meta["arrays"].items():
+            shape = (self.count,) + tuple(spec["shape"])
+            if self.count:
+                self.arrays[name] = np.memmap(os.path.join(path, f"{name}.bin"),
+                                              dtype=spec["dtype"], mode='r', shape=shape)
+            else:
+                self.arrays[name] = np.empty(shape, dtype=spec["dtype"])
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def grids(self) -> np.ndarray:
+        """Toutes les grilles (count, 25, 25), complétées par des 0"""
+        return self.arrays["grids"]
+
+    @property
+    def features(self) -> np.ndarray:
+        """Matrice des features (count, len(feature_columns))"""
+        return self.arrays["features"]
+
+    def info(self, column: str) -> np.ndarray:
+        """Une colonne entière sur tout le corpus (ex: "difficulty")"""
+        return self.arrays["info"][:, self.info_columns.index(column)]
+
+    def feature(self, column: str) -> np.ndarray:
+        """Une colonne de features sur tout le corpus"""
+        return self.arrays["features"][:, self.feature_columns.index(column)]
+
+    def grid(self, i: int) -> np.ndarray:
+        """Grille du niveau i à sa taille réelle (vue sur le fichier, sans copie)"""
+        size = int(self.arrays["info"][i, self.info_columns.index("grid_size")])
+        return self.arrays["grids"][i, :size, :size]
+
+    def __getitem__(self, i: int) -> Dict:
+        """Niveau i décodé au format habituel (dictionnaire de listes)"""
+        if not -self.count <= i < self.count:
+            raise IndexError(f"Niveau {i} hors du dataset ({self.count} niveaux)")
+        i %= self.count
+
+        info = dict(zip(self.info_columns, self.arrays["info"][i].tolist()))
+        player_pos, goal_pos = self.arrays["positions"][i].tolist()
+        level = {
+            "level": info["level"],
+            "difficulty": info["difficulty"],
+            "grid": self.grid(i).tolist(),
+            "player_pos": player_pos,
+            "goal_pos": goal_pos,
+            "time_limit": info["time_limit"],
+            "total_icy": info["num_icy"],
+            "crystals_icy": self.arrays["crystals_icy"][i, :info["num_icy"]].tolist(),
+            "crystals_gold": self.arrays["crystals_gold"][i, :info["num_gold"]].tolist(),
+            "crystals_red": self.arrays["crystals_red"][i, :info["num_red"]].tolist(),
+            "grid_size": info["grid_size"],
+        }
+
+        # Datasets version 1: ni min_moves ni min_time
+        if info.get("min_moves", NO_SOLUTION) != NO_SOLUTION:
+            level["min_moves"] = info["min_moves"]
+        if "min_time" in self.arrays and not np.isnan(self.arrays["min_time"][i]):
+            level["min_time"] = round(float(self.arrays["min_time"][i]), 3)
+
+        features = self.arrays["features"][i]
+        if not np.isnan(features).all():
+            level["features"] = {column: _feature_value(value)
+                                 for column, value in zip(self.feature_columns, features.tolist())}
+        if info["dataset_index"] >= 0:
+            level["dataset_index"] = info["dataset_index"]
+        return level
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self.count):
+            yield self[i]
+
+
+def _feature_value(value: float):
+    """Les features entières redeviennent des int, les ratios restent arrondis, NaN redevient None"""
+    if np.isnan(value):
+        return None
+    return int(value) if float(value).is_integer() else round(value, 3)
@@ -0,0 +1,191 @@
+"""
+Logs structurés du serveur: un événement = un nom, un message lisible et des champs
+
+    log = get_logger("game")
+    log.debug("crystal_collected", "💎 Crystal Icy collecté", crystal="icy", collected=2)
+
+Conçu pour les chemins chauds de la boucle asyncio:
+- niveau filtré d'abord (isEnabledFor est mis en cache par logging): un événement
+  désactivé ne crée aucun LogRecord
+- échantillonnage par événement (LOG_SAMPLING), décidé avant la création du record
+- la boucle ne fait que déposer le record dans une file bornée (QueueHandler); le
+  formatage et l'écriture sur stdout se font dans le thread d'un QueueListener.
+  File pleine (stdout bloqué): le record est abandonné et compté, jamais attendu
+
+Configuration (variables d'environnement, lues par setup_logging):
+    LOG_LEVEL       INFO par défaut, avec niveaux par logger: "INFO,game=DEBUG,storage=WARNING"
+    LOG_SAMPLING    fraction gardée par événement: "crystal_collected=0.01,level_sent=0.1"
+    LOG_FORMAT      text (défaut) ou json (une ligne JSON par événement)
+    LOG_QUEUE_SIZE  taille de la file avant abandon (10000)
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+import metrics
+
+ROOT = "pathmind"
+
+# Fraction gardée par nom d'événement (absent = tout garder)
+SAMPLING: Dict[str, float] = {}
+
+_listener: Optional["DrainingQueueListener"] = None
+_handler: Optional[QueueHandler] = None
+
+
+class EventLogger:
+    """Logger d'événements: filtre par niveau puis échantillonne avant tout travail"""
+
+    __slots__ = ("logger",)
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(f"{ROOT}.{name}")
+
+    def enabled(self, level: int = logging.INFO) -> bool:
+        """Pour éviter de calculer des champs coûteux quand le niveau est filtré"""
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, event: str, message: str, **fields):
+        self.log(logging.DEBUG, event, message, fields)
+
+    def info(self, event: str, message: str, **fields):
+        self.log(logging.INFO, event, message, fields)
+
+    def warning(self, event: str, message: str, **fields):
+        self.log(logging.WARNING, event, message, fields)
+
+    def error(self, event: str, message: str, exc_info: bool = False, **fields):
+        self.log(logging.ERROR, event, message, fields, exc_info)
+
+    def log(self, level: int, event: str, message: str, fields: Dict, exc_info: bool = False):
+        if not self.logger.isEnabledFor(level):
+            return
+        rate = SAMPLING.get(event)
+        if rate is not None and random.random() >= rate:
+            return
+        extra = {"event": event, "fields": fields}
+        if rate is not None:
+            extra["sample_rate"] = rate
+        self.logger.log(level, message, exc_info=exc_info, extra=extra)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler qui n'attend jamais: file pleine = record abandonné (pathmind_log_dropped_total)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Même processus: le formatage est laissé au thread du listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_DROPPED.inc()
+
+
+class DrainingQueueListener(QueueListener):
+    """À l'arrêt, attendre une place pour la sentinelle plutôt qu'échouer sur une file pleine"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class EventFormatter(logging.Formatter):
+    """Ligne texte "heure niveau message | event k=v" ou objet JSON"""
+
+    def __init__(self, as_json: bool = False):
+        super().__init__(datefmt="%Y-%m-%dT%H:%M:%S")
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = getattr(record, "event", None)
+        fields = getattr(record, "fields", {})
+        rate = getattr(record, "sample_rate", None)
+
+        if self.as_json:
+            data = {
+                "ts": self.formatTime(record, self.datefmt),
+                "level": record.levelname.lower(),
+                "logger": record.name,
+                "event": event,
+                "message": record.getMessage()
+            }
+            data.update(fields)
+            if rate is not None:
+                data["sample_rate"] = rate
+            if record.exc_info:
+                data["exception"] = self.formatException(record.exc_info)
+            return json.dumps(data, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record, self.datefmt)} {record.levelname:<7} {record.getMessage()}"
+        if event:
+            pairs = " ".join(f"{key}={value}" for key, value in fields.items())
+            line += f" | event={event} {pairs}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def get_logger(name: str) -> EventLogger:
+    return EventLogger(name)
+
+
+def parse_pairs(spec: str) -> Dict[str, str]:
+    """ "a=1,b=2" -> {"a": "1", "b": "2"}, une entrée sans "=" est rangée sous "" """
+    pairs = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        if sep:
+            pairs[key.strip()] = value.strip()
+        else:
+            pairs[""] = key
+    return pairs
+
+
+def setup_logging(level: Optional[str] = None, sampling: Optional[str] = None,
+                  fmt: Optional[str] = None, queue_size: Optional[int] = None):
+    """Brancher les logs pathmind sur stdout via la file (une seule fois par processus)"""
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    levels = parse_pairs(level or os.getenv("LOG_LEVEL", "INFO"))
+    root = logging.getLogger(ROOT)
+    root.setLevel(levels.pop("", "INFO").upper())
+    for name, name_level in levels.items():
+        logging.getLogger(f"{ROOT}.{name}").setLevel(name_level.upper())
+
+    SAMPLING.clear()
+    for event, rate in parse_pairs(sampling or os.getenv("LOG_SAMPLING", "")).items():
+        SAMPLING[event] = min(1.0, max(0.0, float(rate)))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(EventFormatter(as_json=(fmt or os.getenv("LOG_FORMAT", "text")) == "json"))
+
+    log_queue = queue.Queue(maxsize=queue_size or int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+    _handler = DroppingQueueHandler(log_queue)
+    root.addHandler(_handler)
+    root.propagate = False
+
+    _listener = DrainingQueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Vider la file et arrêter le thread d'écriture"""
+    global _listener, _handler
+    if _listener is None:
+        return
+    logging.getLogger(ROOT).removeHandler(_handler)
+    _listener.stop()
+    _listener = _handler = None
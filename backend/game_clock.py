@@ -0,0 +1,144 @@
+import asyncio
+import heapq
+import itertools
+from typing import Callable, Dict, Optional
+
+from game_session import GameSession
+from event_log import get_logger
+
+log = get_logger("game")
+
+
+class GameClock:
+    """
+    Horloge unique du serveur pour les timers de toutes les parties
+    - un tas de deadlines: le game over part exactement à l'échéance
+    - un tick à tick_rate Hz qui envoie les timer_update de toutes les sessions en une passe
+    Les boucles de réception n'ont plus besoin de timeout. L'horloge n'attend jamais un
+    client: les messages sont déposés dans la file d'envoi de chaque connexion.
+    """
+
+    def __init__(self, tick_rate: float = 10.0):
+        self.interval = 1.0 / tick_rate
+        self._sessions: Dict[int, tuple] = {}   # id(session) -> (session, post)
+        self._heap = []                          # (deadline, seq, session)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ===== CYCLE DE VIE =====
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ===== SESSIONS =====
+    def register(self, session: GameSession, post: Callable[[Dict], bool]):
+        """Associer une session à sa fonction d'envoi sans attente (GameConnection.post)"""
+        session.deadline = None
+        self._sessions[id(session)] = (session, post)
+
+    def unregister(self, session: GameSession):
+        session.deadline = None
+        self._sessions.pop(id(session), None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # ===== TIMERS =====
+    def start_timer(self, session: GameSession, time_left: float):
+        """(Re)lancer le compte à rebours d'une session"""
+        session.time_left = time_left
+        session.deadline = self.now() + time_left
+        self.reschedule(session)
+
+    def stop_timer(self, session: GameSession):
+        """Figer le timer (victoire, game over): l'échéance en attente est ignorée"""
+        if session.deadline is not None:
+            session.time_left = session.remaining(self.now())
+        session.deadline = None
+
+    def reschedule(self, session: GameSession):
+        """Prendre en compte une deadline modifiée (ex: pénalité du cristal rouge)"""
+        if session.deadline is None:
+            return
+        heapq.heappush(self._heap, (session.deadline, next(self._seq), session))
+        # Réveiller la boucle si cette échéance arrive avant son prochain réveil
+        if self._wakeup and self._heap[0][2] is session:
+            self._wakeup.set()
+
+    def time_left(self, session: GameSession) -> float:
+        return session.remaining(self.now())
+
+    @staticmethod
+    def now() -> float:
+        return asyncio.get_running_loop().time()
+
+    # ===== BOUCLE =====
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.interval
+
+        while True:
+            now = loop.time()
+            self._expire(now)
+
+            if now >= next_tick:
+                self._tick(now)
+                # Pas de rattrapage en rafale si la boucle a pris du retard
+                next_tick = max(next_tick + self.interval, now + self.interval / 2)
+
+            wake_at = next_tick
+            if self._heap:
+                wake_at = min(wake_at, self._heap[0][0])
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(0.0, wake_at - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    def _expire(self, now: float):
+        """Déclencher le game over de toutes les sessions arrivées à échéance"""
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, session = heapq.heappop(self._heap)
+            # Entrée périmée: timer arrêté, relancé ou modifié depuis
+            if session.deadline != deadline or id(session) not in self._sessions:
+                continue
+
+            session.deadline = None
+            session.time_left = 0
+            session.game_over = True
+            log.info("time_up", "⏰ Temps écoulé ! Game Over", username=session.username)
+            expired.append(session)
+
+        self._send_all(expired, lambda session: {
+            "type": "game_over",
+            "time_left": 0,
+            "message": "Temps écoulé !"
+        })
+
+    def _tick(self, now: float):
+        """Envoyer le temps restant à toutes les sessions actives"""
+        active = []
+        for session, _ in self._sessions.values():
+            if session.deadline is not None:
+                session.time_left = max(0.0, session.deadline - now)
+                active.append(session)
+
+        self._send_all(active, lambda session: {
+            "type": "timer_update",
+            "time_left": session.time_left
+        })
+
+    def _send_all(self, sessions, build: Callable[[GameSession], Dict]):
+        for session in sessions:
+            # Refusé = client parti ou file pleine (client trop lent): on arrête de le suivre
+            if not self._sessions[id(session)][1](build(session)):
+                self.unregister(session)
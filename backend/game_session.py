@@ -0,0 +1,184 @@
+from typing import Dict, List, Optional
+
+# Résultats de GameSession.step
+BLOCKED = 0          # mur ou bord: rien ne change
+MOVED = 1            # déplacement simple
+GOLD = 2             # cristal gold ramassé
+ICY = 3              # cristal icy ramassé
+RED = 4              # cristal rouge: -3 secondes
+RED_GAME_OVER = 5    # cristal rouge fatal
+NEED_CRYSTALS = 6    # goal atteint sans tous les cristaux icy
+VICTORY = 7
+
+# Types de cellules (voir LevelGenerator)
+EMPTY = 0
+CRYSTAL_GOLD = 4
+CRYSTAL_ICY = 5
+CRYSTAL_RED = 6
+WALLS = (1, 2, 3)
+
+RED_PENALTY = 3.0
+
+
+class GameSession:
+    """
+    État d'une partie, indépendant du WebSocket
+    La grille est un bytearray à plat (index = y * width + x): la valeur d'une cellule
+    sert aussi d'index des cristaux par coordonnée, et la passabilité est précalculée.
+    step() ne fait que des comparaisons d'entiers et n'alloue rien.
+
+    Le temps est porté par deadline (horloge asyncio, gérée par GameClock)
+    ou, timer arrêté, par time_left.
+    """
+
+    __slots__ = (
+        "user_id", "username", "level",
+        "width", "height", "cells", "passable",
+        "player_x", "player_y", "goal_index",
+        "total_icy", "collected_icy", "collected_gold",
+        "time_left", "deadline", "game_over", "victory",
+        "grid_rev", "last_change"
+    )
+
+    def __init__(self, user_id: Optional[str] = None, username: Optional[str] = None):
+        self.user_id = user_id
+        self.username = username
+        self.level = 1
+        self.width = 0
+        self.height = 0
+        self.cells = bytearray()
+        self.passable = bytes()
+        self.player_x = 0
+        self.player_y = 0
+        self.goal_index = -1
+        self.total_icy = 0
+        self.collected_icy = 0
+        self.collected_gold = 0
+        self.time_left = 30.0
+        self.deadline: Optional[float] = None
+        self.game_over = False
+        self.victory = False
+        self.grid_rev = 0
+        self.last_change = -1
+
+    # ===== CHARGEMENT =====
+    def load(self, level_data: Dict, level_num: int):
+        """Charger un niveau (format des niveaux générés) et remettre la partie à zéro"""
+        grid = level_data["grid"]
+        self.level = level_num
+        self.height = len(grid)
+        self.width = len(grid[0])
+        self.cells = bytearray(cell & 0xFF for row in grid for cell in row)
+        self.passable = bytes(0 if cell in WALLS else 1 for row in grid for cell in row)
+        self.player_x, self.player_y = level_data["player_pos"]
+        gx, gy = level_data["goal_pos"]
+        self.goal_index = gy * self.width + gx
+        self.total_icy = level_data.get("total_icy", 0)
+        self.collected_icy = 0
+        self.collected_gold = 0
+        self.time_left = float(level_data.get("time_limit", 30.0))
+        self.deadline = None
+        self.game_over = False
+        self.victory = False
+        self.grid_rev = 0
+        self.last_change = -1
+
+    @property
+    def loaded(self) -> bool:
+        return self.width > 0
+
+    @property
+    def active(self) -> bool:
+        return self.loaded and not self.game_over and not self.victory
+
+    # ===== RÈGLES =====
+    def step(self, dx: int, dy: int, now: float = 0.0) -> int:
+        """Appliquer un déplacement et retourner son résultat (BLOCKED, MOVED, ...)"""
+        x = self.player_x + dx
+        y = self.player_y + dy
+
+        # Vérifier les limites
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return BLOCKED
+
+        i = y * self.width + x
+
+        # Vérifier si c'est un mur
+        if not self.passable[i]:
+            return BLOCKED
+
+        # Vérifier si c'est le goal
+        if i == self.goal_index:
+            if self.collected_icy < self.total_icy:
+                return NEED_CRYSTALS
+            self.player_x = x
+            self.player_y = y
+            self.victory = True
+            return VICTORY
+
+        # Déplacer le joueur
+        self.player_x = x
+        self.player_y = y
+
+        # Vérifier collecte de cristaux
+        cell = self.cells[i]
+        if cell == CRYSTAL_GOLD:
+            self.collected_gold += 1
+            self._clear(i)
+            return GOLD
+
+        if cell == CRYSTAL_ICY:
+            self.collected_icy += 1
+            self._clear(i)
+            return ICY
+
+        if cell == CRYSTAL_RED:
+            self._clear(i)
+            if self.deadline is None:
+                self.time_left -= RED_PENALTY
+                remaining = self.time_left
+            else:
+                self.deadline -= RED_PENALTY
+                remaining = self.deadline - now
+            if remaining <= 0:
+                self.time_left = 0
+                self.deadline = None
+                self.game_over = True
+                return RED_GAME_OVER
+            return RED
+
+        return MOVED
+
+    def _clear(self, i: int):
+        """Retirer un cristal: nouvelle révision de la grille, cellule notée pour le delta"""
+        self.cells[i] = EMPTY
+        self.grid_rev += 1
+        self.last_change = i
+
+    # ===== TEMPS =====
+    def remaining(self, now: float) -> float:
+        """Temps restant à l'instant now"""
+        if self.deadline is None:
+            return self.time_left
+        return max(0.0, self.deadline - now)
+
+    # ===== SÉRIALISATION =====
+    @property
+    def player_pos(self) -> List[int]:
+        return [self.player_x, self.player_y]
+
+    @property
+    def goal_pos(self) -> List[int]:
+        return [self.goal_index % self.width, self.goal_index // self.width]
+
+    def grid(self) -> List[List[int]]:
+        """Grille en listes imbriquées (messages init et grid_sync)"""
+        signed = memoryview(self.cells).cast('b')
+        w = self.width
+        return [signed[y * w:(y + 1) * w].tolist() for y in range(self.height)]
+
+    def last_change_cell(self) -> List[int]:
+        """Dernière cellule modifiée au format delta [x, y, valeur]"""
+        i = self.last_change
+        value = self.cells[i]
+        return [i % self.width, i // self.width, value - 256 if value > 127 else value]
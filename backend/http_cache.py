@@ -0,0 +1,326 @@
+"""
+Cache HTTP des routes de lecture (middleware ASGI autour de l'application FastAPI)
+
+- réponses sérialisées mémorisées par chemin + paramètres de la route (triés, les autres
+  ignorés), invalidées à l'écriture (invalidate), quand la version de la route change
+  (ex: Leaderboard.version) ou au bout de ttl secondes
+- une réponse calculée pendant un invalidate n'est pas mémorisée (compteur de génération)
+- taille totale bornée en octets (corps et variantes compressées), LRU
+- ETag fort par représentation, If-None-Match -> 304 sans corps
+- compression gzip, ou brotli si le module brotli est installé, choisie selon Accept-Encoding;
+  les variantes compressées sont calculées une fois par réponse mémorisée
+- les réponses en flux (StreamingResponse) ne sont pas mémorisées mais sont compressées au fil de l'eau
+"""
+import hashlib
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+class CachedResponse:
+    """Corps d'une réponse 200 et ses variantes compressées"""
+
+    __slots__ = ("version", "body", "content_type", "etag", "variants", "created", "size")
+
+    def __init__(self, version: Hashable, body: bytes, content_type: str):
+        self.version = version
+        self.body = body
+        self.content_type = content_type
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.variants: Dict[str, bytes] = {}
+        self.created = time.monotonic()
+        # Octets comptés par ResponseCache (corps + variantes)
+        self.size = len(body)
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        data = self.variants.get(encoding)
+        if data is None:
+            data = self.variants[encoding] = compress(self.body, encoding)
+            self.size += len(data)
+        return data
+
+
+class ResponseCache:
+    """
+    Réponses mémorisées des routes enregistrées (LRU bornée en octets)
+    version: appelée à chaque requête, une entrée d'une autre version est ignorée
+    params: paramètres de query string qui changent la réponse, les autres ne font pas
+    partie de la clé (une query string arbitraire ne crée pas d'entrée)
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_body: int = 4 * 1024 * 1024,
+                 min_compress: int = 512, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.max_body = min(max_body, max_bytes)
+        self.min_compress = min_compress
+        self.ttl = ttl
+        self.routes: Dict[str, Optional[Callable[[], Hashable]]] = {}
+        self.params: Dict[str, frozenset] = {}
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        # Incrémenté par invalidate: une réponse commencée avant n'est pas mémorisée
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def route(self, path: str, version: Optional[Callable[[], Hashable]] = None,
+              params: Iterable[str] = ()):
+        """Mettre en cache les GET sur path"""
+        self.routes[path] = version
+        self.params[path] = frozenset(params)
+
+    def version(self, path: str) -> Hashable:
+        version = self.routes.get(path)
+        return version() if version else None
+
+    def key(self, path: str, query_string: bytes) -> Tuple[str, str]:
+        """Chemin + paramètres de la route, triés (même clé quel que soit leur ordre)"""
+        allowed = self.params.get(path)
+        if not allowed or not query_string:
+            return path, ""
+        pairs = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+        return path, urlencode(sorted(pair for pair in pairs if pair[0] in allowed))
+
+    def get(self, key: Tuple[str, str], version: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            return None
+        if self.ttl is not None and time.monotonic() - entry.created > self.ttl:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple[str, str], entry: CachedResponse, generation: int):
+        """Mémoriser entry, sauf si le cache a été invalidé depuis generation"""
+        if generation != self.generation or entry.size > self.max_body:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._trim()
+
+    def encoded(self, key: Tuple[str, str], entry: CachedResponse, encoding: Optional[str]) -> bytes:
+        """Corps dans l'encodage demandé; une nouvelle variante compte dans la taille du cache"""
+        size = entry.size
+        data = entry.encoded(encoding)
+        if entry.size != size and self._entries.get(key) is entry:
+            self._bytes += entry.size - size
+            self._trim()
+        return data
+
+    def invalidate(self, path: Optional[str] = None):
+        """Oublier les réponses d'une route (toutes ses query strings), ou tout le cache"""
+        self.generation += 1
+        if path is None:
+            self._entries.clear()
+            self._bytes = 0
+            return
+        for key in [key for key in self._entries if key[0] == path]:
+            self._remove(key)
+
+    def _remove(self, key: Tuple[str, str]):
+        self._bytes -= self._entries.pop(key).size
+
+    def _trim(self):
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class HTTPCacheMiddleware:
+    """Middleware ASGI: cache, ETag/304 et compression pour les routes de ResponseCache"""
+
+    def __init__(self, app, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "GET"
+                or scope["path"] not in self.cache.routes):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate(headers.get("accept-encoding", ""))
+        key = self.cache.key(scope["path"], scope["query_string"])
+        version = self.cache.version(scope["path"])
+
+        entry = self.cache.get(key, version)
+        if entry is None:
+            self.cache.misses += 1
+            # Relevée avant la route: un invalidate pendant son exécution rend la réponse périmée
+            generation = self.cache.generation
+            entry = await self._capture(scope, receive, send, version, encoding)
+            if entry is None:
+                return  # réponse déjà envoyée (erreur ou flux)
+            self.cache.put(key, entry, generation)
+        else:
+            self.cache.hits += 1
+
+        await self._send(key, entry, encoding, headers.get("if-none-match"), send)
+
+    async def _capture(self, scope, receive, send, version, encoding) -> Optional[CachedResponse]:
+        """
+        Exécuter la route: une réponse 200 en un seul morceau est retournée pour être mise
+        en cache, le reste est transmis tel quel (un flux est compressé au passage)
+        """
+        start = None
+        body: List[bytes] = []
+        stream: Optional[StreamEncoder] = None
+
+        async def capture_send(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            if stream is not None:
+                await stream.send(message)
+                return
+
+            if not message.get("more_body", False):
+                body.append(message.get("body", b""))
+                if start["status"] != 200:
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(body)})
+                return
+
+            # Premier morceau d'un flux: on arrête de mémoriser
+            stream = StreamEncoder(send, start, encoding if self._compressible(start) else None)
+            await stream.send(message)
+
+        await self.app(scope, receive, capture_send)
+
+        if stream is not None or start is None or start["status"] != 200:
+            return None
+
+        content_type = Headers(raw=start["headers"]).get("content-type", "application/json")
+        return CachedResponse(version, b"".join(body), content_type)
+
+    async def _send(self, key: Tuple[str, str], entry: CachedResponse, encoding: Optional[str],
+                    if_none_match: Optional[str], send):
+        if len(entry.body) < self.cache.min_compress:
+            encoding = None
+
+        etag = f'"{entry.etag}-{encoding}"' if encoding else f'"{entry.etag}"'
+        headers = [
+            (b"etag", etag.encode()),
+            (b"vary", b"Accept-Encoding"),
+            (b"cache-control", b"no-cache")
+        ]
+
+        if if_none_match and etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        data = self.cache.encoded(key, entry, encoding)
+        headers.append((b"content-type", entry.content_type.encode()))
+        headers.append((b"content-length", str(len(data)).encode()))
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": data})
+
+    @staticmethod
+    def _compressible(start) -> bool:
+        return start["status"] == 200 and "content-encoding" not in Headers(raw=start["headers"])
+
+
+class StreamEncoder:
+    """Transmettre une réponse en flux, compressée morceau par morceau (gzip ou brotli)"""
+
+    def __init__(self, send, start, encoding: Optional[str]):
+        self._send = send
+        self._start = start
+        self.encoding = encoding
+        self._compressor = None
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor()
+
+    async def send(self, message):
+        if self._start is not None:
+            start, self._start = self._start, None
+            if self.encoding:
+                headers = MutableHeaders(raw=list(start["headers"]))
+                del headers["content-length"]
+                headers["content-encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                start = dict(start, headers=headers.raw)
+            await self._send(start)
+
+        if self._compressor is None:
+            await self._send(message)
+            return
+
+        more_body = message.get("more_body", False)
+        body = message.get("body", b"")
+        if self.encoding == "gzip":
+            data = self._compressor.compress(body)
+            data += self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+        else:
+            data = self._compressor.process(body)
+            data += self._compressor.flush() if more_body else self._compressor.finish()
+
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Meilleur encodage accepté par le client (br > gzip), None = identité"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match correspond-il à l'une des représentations de ce corps ?"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate.split("-", 1)[0] == etag:
+            return True
+    return False
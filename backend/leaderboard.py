@@ -0,0 +1,164 @@
+import asyncio
+import bisect
+from typing import Callable, Dict, List, Optional
+
+from event_log import get_logger
+
+log = get_logger("leaderboard")
+
+
+class Leaderboard:
+    """
+    Classement en mémoire (top K par gold) devant la collection users
+    - chargé une fois au démarrage, mis à jour à chaque victoire: la lecture ne touche pas MongoDB
+    - les $inc des victoires sont cumulés par joueur et écrits en un bulk_write périodique
+      (write-behind), avec un dernier flush à l'arrêt du serveur
+
+    Les entrées connues incluent toujours les incréments pas encore écrits.
+    """
+
+    def __init__(self, db, size: int = 50, flush_interval: float = 2.0, max_known: int = 10000):
+        self.db = db
+        self.size = size
+        self.flush_interval = flush_interval
+        self.max_known = max_known
+
+        self._known: Dict[str, Dict] = {}       # username -> entrée à jour
+        self._ranking: List[tuple] = []         # (-total_gold, username) trié, au plus size
+        self._pending: Dict[str, List[int]] = {}  # username -> [gold, niveaux] à écrire
+        self._lock = asyncio.Lock()              # lecture d'un joueur vs flush en cours
+        self._snapshot: Optional[List[Dict]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.version = 0                         # incrémenté à chaque changement du top
+        self.on_change: Optional[Callable[[], None]] = None
+
+    # ===== CYCLE DE VIE =====
+    async def start(self):
+        """Charger le top K puis lancer l'écriture périodique"""
+        for entry in await self.db.get_leaderboard(limit=self.size):
+            self._known[entry["username"]] = dict(entry)
+            self._rank(entry["username"])
+        self._task = asyncio.create_task(self._run())
+        log.info("leaderboard_loaded", "🏆 Leaderboard chargé", players=len(self._ranking))
+
+    async def stop(self):
+        """Arrêter la boucle et écrire les incréments restants"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    # ===== LECTURE =====
+    def top(self) -> List[Dict]:
+        """Top K (liste partagée, reconstruite seulement quand le classement change)"""
+        if self._snapshot is None:
+            self._snapshot = [dict(self._known[username]) for _, username in self._ranking]
+        return self._snapshot
+
+    def overlay(self, user: Dict) -> Dict:
+        """Compléter un utilisateur lu en base avec les gains pas encore écrits"""
+        entry = self._known.get(user.get("username"))
+        if entry is not None:
+            user["total_gold"] = entry["total_gold"]
+            user["levels_completed"] = entry["levels_completed"]
+        return user
+
+    # ===== ÉCRITURE =====
+    def add_user(self, username: str):
+        """Nouvel inscrit: 0 gold, entre dans le top s'il reste de la place"""
+        if username not in self._known:
+            self._known[username] = {"username": username, "total_gold": 0, "levels_completed": 0}
+            self._rank(username)
+
+    async def record(self, username: str, gold: int, levels_completed: int = 1):
+        """Enregistrer une victoire: classement à jour tout de suite, écriture différée"""
+        pending = self._pending.setdefault(username, [0, 0])
+        pending[0] += gold
+        pending[1] += levels_completed
+
+        entry = self._known.get(username)
+        if entry is not None:
+            entry["total_gold"] += gold
+            entry["levels_completed"] += levels_completed
+            self._rank(username)
+            return
+
+        # Joueur hors du top jamais vu: lire son total une fois
+        await self._load_user(username)
+
+    async def flush(self) -> int:
+        """Écrire tous les incréments en attente en un seul bulk_write"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            try:
+                written = await self.db.apply_user_increments(
+                    {username: tuple(inc) for username, inc in pending.items()}
+                )
+            except Exception as e:
+                # Remettre les incréments pour le prochain flush
+                for username, (gold, completed) in pending.items():
+                    current = self._pending.setdefault(username, [0, 0])
+                    current[0] += gold
+                    current[1] += completed
+                log.error("leaderboard_flush_failed", "❌ Flush du leaderboard", error=repr(e),
+                          pending=len(pending))
+                return 0
+
+            self._trim()
+            return written
+
+    # ===== INTERNE =====
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _load_user(self, username: str):
+        # Sous le verrou, la base contient exactement ce qui n'est plus dans _pending
+        async with self._lock:
+            if username in self._known:
+                return  # chargé entre-temps, incrément déjà compté
+
+            entry = await self.db.get_user_stats(username)
+            if entry is None:
+                # Pas de compte: rien à écrire
+                self._pending.pop(username, None)
+                return
+
+            gold, completed = self._pending.get(username, (0, 0))
+            entry["total_gold"] += gold
+            entry["levels_completed"] += completed
+            self._known[username] = entry
+            self._rank(username)
+
+    def _rank(self, username: str):
+        """Replacer un joueur dans le top K (le gold ne fait qu'augmenter)"""
+        entry = self._known[username]
+        key = (-entry["total_gold"], username)
+
+        for i, (_, name) in enumerate(self._ranking):
+            if name == username:
+                del self._ranking[i]
+                break
+        else:
+            if len(self._ranking) >= self.size and key > self._ranking[-1]:
+                return  # pas assez de gold pour entrer dans le top
+
+        bisect.insort(self._ranking, key)
+        del self._ranking[self.size:]
+        self._snapshot = None
+        self.version += 1
+        if self.on_change:
+            self.on_change()
+
+    def _trim(self):
+        """Oublier les joueurs hors du top sans écriture en attente"""
+        if len(self._known) <= self.max_known:
+            return
+
+        keep = {username for _, username in self._ranking} | set(self._pending)
+        self._known = {username: entry for username, entry in self._known.items() if username in keep}
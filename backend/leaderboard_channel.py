@@ -0,0 +1,114 @@
+import asyncio
+import json
+from typing import Callable, Dict, Optional
+
+from fastapi import WebSocket
+
+from leaderboard import Leaderboard
+
+
+class Subscriber:
+    """
+    Un abonné et sa propre tâche d'envoi
+    File d'un seul message: un classement pas encore parti est remplacé par le plus récent,
+    un socket lent ne retient donc que lui-même et jamais plus d'un message.
+    """
+
+    def __init__(self, websocket: WebSocket, on_error: Callable[[WebSocket], None]):
+        self.websocket = websocket
+        self._pending: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._task = asyncio.create_task(self._run(on_error))
+
+    def post(self, payload: str):
+        if self._pending.full():
+            self._pending.get_nowait()
+        self._pending.put_nowait(payload)
+
+    def cancel(self):
+        self._task.cancel()
+
+    async def _run(self, on_error: Callable[[WebSocket], None]):
+        try:
+            while True:
+                await self.websocket.send_text(await self._pending.get())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Un envoi qui échoue = abonné parti
+            on_error(self.websocket)
+
+
+class LeaderboardChannel:
+    """
+    Diffusion du classement aux abonnés de /ws/leaderboard
+    Les changements sont regroupés: au plus max_rate envois par seconde, et chaque envoi
+    sérialise le top une seule fois pour tous les abonnés. Sans victoire, rien n'est envoyé.
+    La diffusion ne fait que déposer le message chez chaque abonné (Subscriber).
+    """
+
+    def __init__(self, leaderboard: Leaderboard, max_rate: float = 2.0):
+        self.leaderboard = leaderboard
+        self.interval = 1.0 / max_rate
+        self._subscribers: Dict[WebSocket, Subscriber] = {}
+        self._payload: Optional[str] = None
+        self._version = -1
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ===== CYCLE DE VIE =====
+    async def start(self):
+        self._changed = asyncio.Event()
+        self.leaderboard.on_change = self.notify
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.leaderboard.on_change = None
+        for websocket in list(self._subscribers):
+            self.unsubscribe(websocket)
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ===== ABONNÉS =====
+    async def subscribe(self, websocket: WebSocket):
+        """Ajouter un abonné et lui envoyer le classement courant"""
+        subscriber = self._subscribers[websocket] = Subscriber(websocket, self.unsubscribe)
+        subscriber.post(self._current_payload())
+
+    def unsubscribe(self, websocket: WebSocket):
+        subscriber = self._subscribers.pop(websocket, None)
+        if subscriber:
+            subscriber.cancel()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def notify(self):
+        """Appelé par le Leaderboard quand le top change"""
+        if self._changed:
+            self._changed.set()
+
+    # ===== DIFFUSION =====
+    def _current_payload(self) -> str:
+        """Message JSON du top, resérialisé seulement si le classement a changé"""
+        if self.leaderboard.version != self._version:
+            self._version = self.leaderboard.version
+            self._payload = json.dumps({"type": "leaderboard", "leaderboard": self.leaderboard.top()})
+        return self._payload
+
+    async def _run(self):
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            self._broadcast()
+            # Les changements arrivés pendant cette fenêtre partent au prochain envoi
+            await asyncio.sleep(self.interval)
+
+    def _broadcast(self):
+        if not self._subscribers:
+            return
+
+        payload = self._current_payload()
+        for subscriber in self._subscribers.values():
+            subscriber.post(payload)
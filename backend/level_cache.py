@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class LevelCache:
+    """
+    Cache LRU + TTL des niveaux devant Database.get_level
+    Chaque lecture renvoie une copie: une session peut modifier sa grille
+    (cristaux ramassés) sans toucher à l'exemplaire en cache
+    Un chargement en cours pendant invalidate() n'est pas mis en cache (compteur de génération)
+    """
+
+    def __init__(self, maxsize: int = 64, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._pending: Dict[int, asyncio.Future] = {}
+        # Incrémenté par invalidate: un chargement commencé avant n'est pas mémorisé
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, level_num: int,
+                  loader: Callable[[int], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+        """Niveau depuis le cache, sinon via loader (un seul appel par niveau manquant)"""
+        level = self._lookup(level_num)
+        if level is not None:
+            self.hits += 1
+            return copy_level(level)
+
+        self.misses += 1
+
+        # Plusieurs sessions qui ratent le même niveau partagent la même requête
+        pending = self._pending.get(level_num)
+        if pending is None:
+            generation = self.generation
+            pending = asyncio.ensure_future(loader(level_num))
+            self._pending[level_num] = pending
+            try:
+                level = await asyncio.shield(pending)
+            finally:
+                # invalidate() a pu le remplacer par un chargement plus récent
+                if self._pending.get(level_num) is pending:
+                    del self._pending[level_num]
+            if level is not None and generation == self.generation:
+                self.put(level_num, level)
+        else:
+            level = await asyncio.shield(pending)
+
+        return copy_level(level) if level is not None else None
+
+    def put(self, level_num: int, level: Dict):
+        """Ajouter ou remplacer un niveau (copié, l'appelant garde le sien)"""
+        self._entries[level_num] = (time.monotonic() + self.ttl, copy_level(level))
+        self._entries.move_to_end(level_num)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, level_num: Optional[int] = None):
+        """Retirer un niveau, ou tout le cache si level_num est None"""
+        self.generation += 1
+        # Les lectures suivantes ne rejoignent pas un chargement commencé avant
+        if level_num is None:
+            self._entries.clear()
+            self._pending.clear()
+        else:
+            self._entries.pop(level_num, None)
+            self._pending.pop(level_num, None)
+
+    def _lookup(self, level_num: int) -> Optional[Dict]:
+        entry = self._entries.get(level_num)
+        if entry is None:
+            return None
+
+        expires_at, level = entry
+        if expires_at < time.monotonic():
+            del self._entries[level_num]
+            return None
+
+        self._entries.move_to_end(level_num)
+        return level
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def copy_level(level: Dict) -> Dict:
+    """Copie d'un niveau: la grille et les listes de positions sont dupliquées"""
+    copy = dict(level)
+    copy["grid"] = [row[:] for row in level["grid"]]
+    for key in ("player_pos", "goal_pos"):
+        if key in copy:
+            copy[key] = list(copy[key])
+    for key in ("crystals_icy", "crystals_gold", "crystals_red"):
+        if key in copy:
+            copy[key] = [list(pos) for pos in copy[key]]
+    return copy
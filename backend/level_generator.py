@@ -1,8 +1,16 @@
 import numpy as np
 import random
 import json
-from typing import List, Dict, Tuple
+import os
+import time
+from typing import List, Dict, Tuple, Optional, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from collections import deque
+from dataset_io import write_ndjson, count_ndjson, write_binary_dataset
+from event_log import get_logger, setup_logging
+from solver import MOVES_PER_SECOND, LevelSolver, solve_many
+
+log = get_logger("generator")
 
 class LevelGenerator:
     """
@@ -19,74 +27,257 @@ class LevelGenerator:
     CRYSTAL_ICY = 5  # Obligatoire
     CRYSTAL_RED = 6  # Malus -3s
     
-    def __init__(self, grid_size: int = 15):
+    WALLS = (BOX_SMALL, BOX_2X1, BOX_2X2)
+    
+    # Raisons de rejet d'un candidat
+    REJECTION_REASONS = ("too_few_free", "no_path", "icy_unreachable", "too_slow")
+    
+    # Nombre maximum de boxes retirées pour réparer un chemin
+    MAX_REPAIR_BOXES = 3
+    
+    # Étapes chronométrées de generate_level (secondes cumulées dans stats["timings"])
+    STAGES = ("obstacles", "positions", "path", "crystals", "solve")
+    
+    def __init__(self, grid_size: int = 15, max_retries: int = 100, seed: Optional[int] = None,
+                 moves_per_second: Optional[float] = MOVES_PER_SECOND):
         self.grid_size = grid_size
+        self.max_retries = max_retries
+        # Rythme supposé du joueur pour vérifier qu'un niveau se gagne à temps (None = pas de vérification)
+        self.moves_per_second = moves_per_second
+        # Générateurs propres à l'instance: même seed => mêmes niveaux
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.reset_stats()
     
     def generate_level(self, difficulty: int = 1) -> Dict:
         """
         Générer un niveau avec une difficulté donnée (1-10)
+        Boucle bornée par max_retries : un candidat invalide est réparé
+        quand c'est possible, sinon reconstruit
         """
         # Ajuster la taille selon la difficulté
         size = min(self.grid_size + difficulty, 25)
+        timings = self.stats["timings"]
         
-        # Créer une grille vide
-        grid = np.zeros((size, size), dtype=int)
-        
-        # Paramètres selon difficulté
-        num_obstacles = int(5 + difficulty * 3)
-        num_icy = min(1 + difficulty // 2, 5)
-        num_gold = random.randint(1, 3)
-        num_red = random.randint(0, min(difficulty // 3, 3))
-        time_limit = max(15, 45 - difficulty * 2)
-        
-        # Placer les obstacles
-        self._place_obstacles(grid, num_obstacles)
-        
-        # Trouver les positions valides pour joueur et goal
-        valid_positions = self._find_valid_positions(grid)
-        
-        if len(valid_positions) < 2:
-            # Fallback: régénérer
-            return self.generate_level(difficulty)
-        
-        # Choisir des positions éloignées pour le joueur et le goal
-        player_pos, goal_pos = self._choose_distant_positions(valid_positions, size)
-        
-        # Vérifier qu'un chemin existe
-        if not self._path_exists(grid, player_pos, goal_pos):
-            return self.generate_level(difficulty)
-        
-        # Placer les cristaux
-        crystals_icy = self._place_crystals(grid, CRYSTAL_ICY=5, count=num_icy, 
-                                             exclude=[player_pos, goal_pos])
-        crystals_gold = self._place_crystals(grid, CRYSTAL_ICY=4, count=num_gold,
-                                              exclude=[player_pos, goal_pos])
-        crystals_red = self._place_crystals(grid, CRYSTAL_ICY=6, count=num_red,
-                                             exclude=[player_pos, goal_pos])
-        
-        # Vérifier que tous les cristaux icy sont accessibles
-        all_icy_accessible = all(
-            self._path_exists(grid, player_pos, pos, ignore_crystals=True)
-            for pos in crystals_icy
+        for _ in range(self.max_retries):
+            self.stats["attempts"] += 1
+            t0 = time.perf_counter()
+            
+            # Créer une grille vide
+            grid = np.zeros((size, size), dtype=int)
+            
+            # Paramètres selon difficulté
+            num_obstacles = int(5 + difficulty * 3)
+            num_icy = min(1 + difficulty // 2, 5)
+            num_gold = self.rng.randint(1, 3)
+            num_red = self.rng.randint(0, min(difficulty // 3, 3))
+            time_limit = max(15, 45 - difficulty * 2)
+            
+            # Placer les obstacles
+            self._place_obstacles(grid, num_obstacles)
+            t1 = time.perf_counter()
+            timings["obstacles"] += t1 - t0
+            
+            # Trouver les positions valides pour joueur et goal
+            valid_positions = self._find_valid_positions(grid)
+            
+            if len(valid_positions) < 2:
+                # Rien à réparer: reconstruire
+                timings["positions"] += time.perf_counter() - t1
+                self._reject("too_few_free")
+                continue
+            
+            # Choisir des positions éloignées pour le joueur et le goal
+            player_pos, goal_pos = self._choose_distant_positions(valid_positions, size)
+            t2 = time.perf_counter()
+            timings["positions"] += t2 - t1
+            
+            # Vérifier qu'un chemin existe, sinon retirer les boxes qui bloquent
+            # Un seul remplissage depuis le joueur répond à toutes les requêtes suivantes
+            reach = ReachabilityIndex(grid, player_pos)
+            if not reach.reachable(goal_pos):
+                repaired = self._repair_path(grid, player_pos, goal_pos)
+                if not self._reject("no_path", repaired):
+                    timings["path"] += time.perf_counter() - t2
+                    continue
+                reach = ReachabilityIndex(grid, player_pos)
+            t3 = time.perf_counter()
+            timings["path"] += t3 - t2
+            
+            # Placer les cristaux
+            crystals_icy = self._place_crystals(grid, CRYSTAL_ICY=5, count=num_icy, 
+                                                 exclude=[player_pos, goal_pos])
+            crystals_gold = self._place_crystals(grid, CRYSTAL_ICY=4, count=num_gold,
+                                                  exclude=[player_pos, goal_pos])
+            crystals_red = self._place_crystals(grid, CRYSTAL_ICY=6, count=num_red,
+                                                 exclude=[player_pos, goal_pos])
+            
+            # Vérifier que tous les cristaux icy sont accessibles, sinon les déplacer
+            # (les cristaux ne changent pas les murs: l'index reste valide)
+            unreachable = [
+                pos for pos in crystals_icy
+                if not reach.reachable(pos, ignore_crystals=True)
+            ]
+            
+            if unreachable:
+                repaired = self._relocate_crystals(grid, crystals_icy, unreachable,
+                                                   player_pos, goal_pos, reach)
+                if not self._reject("icy_unreachable", repaired):
+                    timings["crystals"] += time.perf_counter() - t3
+                    continue
+            
+            t4 = time.perf_counter()
+            timings["crystals"] += t4 - t3
+            
+            # Vérifier que le niveau se gagne dans le temps imparti
+            solution = self._solve(grid, player_pos, goal_pos, time_limit)
+            timings["solve"] += time.perf_counter() - t4
+            if solution is not None and not solution["winnable"]:
+                self._reject("too_slow")
+                continue
+            
+            self.stats["levels"] += 1
+            level = {
+                "level": 1,
+                "difficulty": difficulty,
+                "grid": grid.tolist(),
+                "player_pos": list(player_pos),
+                "goal_pos": list(goal_pos),
+                "time_limit": time_limit,
+                "total_icy": len(crystals_icy),
+                "crystals_icy": [list(p) for p in crystals_icy],
+                "crystals_gold": [list(p) for p in crystals_gold],
+                "crystals_red": [list(p) for p in crystals_red],
+                "grid_size": size
+            }
+            self._add_solution(level, solution)
+            return level
+        
+        raise RuntimeError(
+            f"Aucun niveau valide après {self.max_retries} tentatives (difficulté {difficulty})"
         )
-        
-        if not all_icy_accessible:
-            return self.generate_level(difficulty)
-        
+    
+    # ===== STATISTIQUES DE REJET =====
+    def reset_stats(self):
+        """Remettre à zéro les compteurs de génération"""
+        self.stats = {
+            "levels": 0,
+            "attempts": 0,
+            "rejected": dict.fromkeys(self.REJECTION_REASONS, 0),
+            "repaired": dict.fromkeys(self.REJECTION_REASONS, 0),
+            "timings": dict.fromkeys(self.STAGES, 0.0)
+        }
+    
+    def get_stats(self) -> Dict:
+        """Copie des compteurs: tentatives, rejets et réparations par raison, temps par étape"""
         return {
-            "level": 1,
-            "difficulty": difficulty,
-            "grid": grid.tolist(),
-            "player_pos": list(player_pos),
-            "goal_pos": list(goal_pos),
-            "time_limit": time_limit,
-            "total_icy": len(crystals_icy),
-            "crystals_icy": [list(p) for p in crystals_icy],
-            "crystals_gold": [list(p) for p in crystals_gold],
-            "crystals_red": [list(p) for p in crystals_red],
-            "grid_size": size
+            "levels": self.stats["levels"],
+            "attempts": self.stats["attempts"],
+            "rejected": dict(self.stats["rejected"]),
+            "repaired": dict(self.stats["repaired"]),
+            "timings": dict(self.stats["timings"])
         }
     
+    def _reject(self, reason: str, repaired: bool = False) -> bool:
+        """Compter un candidat invalide (et sa réparation éventuelle)"""
+        self.stats["rejected"][reason] += 1
+        if repaired:
+            self.stats["repaired"][reason] += 1
+        return repaired
+    
+    # ===== RÉSOLUTION =====
+    def _solve(self, grid: np.ndarray, player_pos: Tuple, goal_pos: Tuple,
+               time_limit: float) -> Optional[Dict]:
+        """Mouvements et temps minimum pour gagner (voir solver), None si désactivé"""
+        if self.moves_per_second is None:
+            return None
+        return LevelSolver(grid, player_pos, goal_pos).solve(self.moves_per_second, time_limit)
+    
+    def _solve_batch(self, grids: np.ndarray, player: np.ndarray, goal: np.ndarray,
+                     time_limit: float, indices: np.ndarray) -> Dict[int, Optional[Dict]]:
+        """_solve pour les grilles indices d'un lot, résolues ensemble (voir solver.solve_many)"""
+        if self.moves_per_second is None:
+            return dict.fromkeys(indices.tolist())
+        solvers = [LevelSolver(grids[i], player[i], goal[i]) for i in indices]
+        return dict(zip(indices.tolist(), solve_many(solvers, self.moves_per_second, time_limit)))
+    
+    @staticmethod
+    def _add_solution(level: Dict, solution: Optional[Dict]):
+        if solution is not None:
+            level["min_moves"] = solution["min_moves"]
+            level["min_time"] = solution["min_time"]
+    
+    # ===== RÉPARATIONS =====
+    def _repair_path(self, grid: np.ndarray, start: Tuple, end: Tuple) -> bool:
+        """
+        Retirer les boxes qui coupent le chemin start -> end
+        BFS 0-1: traverser une box coûte 1, on retire celles du chemin le moins coûteux
+        """
+        size = grid.shape[0]
+        cost = {start: 0}
+        parent = {start: None}
+        queue = deque([start])
+        
+        while queue:
+            x, y = queue.popleft()
+            if (x, y) == end:
+                break
+            
+            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < size and 0 <= ny < size):
+                    continue
+                
+                step = 1 if grid[ny][nx] in self.WALLS else 0
+                new_cost = cost[(x, y)] + step
+                if new_cost < cost.get((nx, ny), new_cost + 1):
+                    cost[(nx, ny)] = new_cost
+                    parent[(nx, ny)] = (x, y)
+                    if step:
+                        queue.append((nx, ny))
+                    else:
+                        queue.appendleft((nx, ny))
+        
+        if cost.get(end, self.MAX_REPAIR_BOXES + 1) > self.MAX_REPAIR_BOXES:
+            return False
+        
+        pos = end
+        while pos is not None:
+            if grid[pos[1]][pos[0]] in self.WALLS:
+                self._remove_box(grid, pos)
+            pos = parent[pos]
+        return True
+    
+    def _remove_box(self, grid: np.ndarray, anchor: Tuple):
+        """Retirer une box entière (coin + marqueurs) à partir de son coin"""
+        x, y = anchor
+        box = grid[y][x]
+        grid[y][x] = self.EMPTY
+        if box in (self.BOX_2X1, self.BOX_2X2):
+            grid[y][x + 1] = self.EMPTY
+        if box == self.BOX_2X2:
+            grid[y + 1][x] = self.EMPTY
+            grid[y + 1][x + 1] = self.EMPTY
+    
+    def _relocate_crystals(self, grid: np.ndarray, crystals: List[Tuple],
+                           unreachable: List[Tuple], player_pos: Tuple,
+                           goal_pos: Tuple, reach: "ReachabilityIndex") -> bool:
+        """Déplacer les cristaux inaccessibles vers des cellules libres atteignables"""
+        targets = [
+            (x, y) for (x, y) in reach.cells(ignore_crystals=True)
+            if grid[y][x] == self.EMPTY and (x, y) not in (player_pos, goal_pos)
+        ]
+        if len(targets) < len(unreachable):
+            return False
+        
+        self.rng.shuffle(targets)
+        for pos, target in zip(unreachable, targets):
+            crystal = grid[pos[1]][pos[0]]
+            grid[pos[1]][pos[0]] = self.EMPTY
+            grid[target[1]][target[0]] = crystal
+            crystals[crystals.index(pos)] = target
+        return True
+    
     def _place_obstacles(self, grid: np.ndarray, count: int):
         """Placer des obstacles de différentes tailles"""
         size = grid.shape[0]
@@ -98,14 +289,14 @@ class LevelGenerator:
             attempts += 1
             
             # Choisir un type d'obstacle aléatoire
-            obstacle_type = random.choices(
+            obstacle_type = self.rng.choices(
                 [self.BOX_SMALL, self.BOX_2X1, self.BOX_2X2],
                 weights=[0.5, 0.3, 0.2]
             )[0]
             
             # Position aléatoire
-            x = random.randint(1, size - 3)
-            y = random.randint(1, size - 3)
+            x = self.rng.randint(1, size - 3)
+            y = self.rng.randint(1, size - 3)
             
             if obstacle_type == self.BOX_SMALL:
                 if grid[y][x] == 0:
@@ -150,7 +341,7 @@ class LevelGenerator:
             (size - 2, size - 2)
         ]
         
-        random.shuffle(corners)
+        self.rng.shuffle(corners)
         
         player_pos = None
         goal_pos = None
@@ -168,7 +359,7 @@ class LevelGenerator:
         
         # Fallback: positions aléatoires
         if player_pos is None:
-            player_pos = random.choice(positions)
+            player_pos = self.rng.choice(positions)
         if goal_pos is None:
             remaining = [p for p in positions if p != player_pos]
             if remaining:
@@ -182,41 +373,10 @@ class LevelGenerator:
     
     def _path_exists(self, grid: np.ndarray, start: Tuple, end: Tuple, 
                      ignore_crystals: bool = False) -> bool:
-        """Vérifier si un chemin existe entre deux points (BFS)"""
+        """Vérifier si un chemin existe entre deux points"""
         if start == end:
             return True
-        
-        size = grid.shape[0]
-        visited = set()
-        queue = deque([start])
-        visited.add(start)
-        
-        while queue:
-            x, y = queue.popleft()
-            
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                nx, ny = x + dx, y + dy
-                
-                if (0 <= nx < size and 0 <= ny < size and 
-                    (nx, ny) not in visited):
-                    
-                    cell = grid[ny][nx]
-                    
-                    # Les murs bloquent toujours
-                    if cell in [self.BOX_SMALL, self.BOX_2X1, self.BOX_2X2]:
-                        continue
-                    
-                    # Les cristaux ne bloquent pas si ignore_crystals
-                    if not ignore_crystals and cell in [self.CRYSTAL_RED]:
-                        continue
-                    
-                    if (nx, ny) == end:
-                        return True
-                    
-                    visited.add((nx, ny))
-                    queue.append((nx, ny))
-        
-        return False
+        return ReachabilityIndex(grid, start).reachable(end, ignore_crystals)
     
     def _place_crystals(self, grid: np.ndarray, CRYSTAL_ICY: int, count: int,
                         exclude: List[Tuple]) -> List[Tuple]:
@@ -225,7 +385,7 @@ class LevelGenerator:
         valid = self._find_valid_positions(grid)
         valid = [p for p in valid if p not in exclude]
         
-        random.shuffle(valid)
+        self.rng.shuffle(valid)
         
         for pos in valid[:count]:
             x, y = pos
@@ -233,50 +393,406 @@ class LevelGenerator:
             placed.append(pos)
         
         return placed
+
+    # ===== GÉNÉRATION PAR LOTS (NumPy) =====
+    def generate_batch(self, n: int, difficulty: int = 1) -> List[Dict]:
+        """
+        Générer n niveaux d'une même difficulté en une seule passe vectorisée
+        Mêmes règles et même format de sortie que generate_level
+        """
+        size = min(self.grid_size + difficulty, 25)
+        num_obstacles = int(5 + difficulty * 3)
+        num_icy = min(1 + difficulty // 2, 5)
+        max_red = min(difficulty // 3, 3)
+        time_limit = max(15, 45 - difficulty * 2)
+
+        levels = []
+        for _ in range(self.max_retries):
+            # Les grilles rejetées sont simplement régénérées au tour suivant
+            levels.extend(self._generate_batch_once(
+                n - len(levels), size, difficulty, num_obstacles,
+                num_icy, max_red, time_limit
+            ))
+            if len(levels) >= n:
+                return levels
+
+        raise RuntimeError(
+            f"Lot incomplet après {self.max_retries} tours: {len(levels)}/{n} niveaux (difficulté {difficulty})"
+        )
+
+    def _generate_batch_once(self, n: int, size: int, difficulty: int,
+                             num_obstacles: int, num_icy: int, max_red: int,
+                             time_limit: int) -> List[Dict]:
+        """Générer un lot de grilles et ne garder que les niveaux valides"""
+        rows = np.arange(n)
+        grids = np.zeros((n, size, size), dtype=np.int8)
+
+        # Placer les obstacles
+        self._place_obstacles_batch(grids, num_obstacles)
+
+        free = grids == self.EMPTY
+        enough = free.reshape(n, -1).sum(axis=1) >= 2
+
+        # Joueur et goal
+        player, goal = self._choose_distant_positions_batch(free)
+
+        # Une seule propagation par grille : les cristaux ne modifient pas les murs,
+        # donc la même zone sert au test joueur -> goal et aux cristaux icy
+        reach = self._flood_fill_batch(~np.isin(grids, self.WALLS), player)
+        has_path = reach[rows, goal[:, 1], goal[:, 0]]
+        valid = enough & has_path
+
+        # Placer les cristaux
+        num_gold = self.np_rng.integers(1, 4, size=n)
+        num_red = self.np_rng.integers(0, max_red + 1, size=n)
+        icy, icy_mask = self._place_crystals_batch(
+            grids, self.CRYSTAL_ICY, np.full(n, num_icy), player, goal)
+        gold, gold_mask = self._place_crystals_batch(
+            grids, self.CRYSTAL_GOLD, num_gold, player, goal)
+        red, red_mask = self._place_crystals_batch(
+            grids, self.CRYSTAL_RED, num_red, player, goal)
+
+        # Vérifier que tous les cristaux icy sont accessibles
+        if icy.shape[1]:
+            icy_reach = reach[rows[:, None], icy[..., 1], icy[..., 0]]
+            icy_ok = np.all(icy_reach | ~icy_mask, axis=1)
+        else:
+            icy_ok = np.ones(n, dtype=bool)
+
+        # Statistiques (pas de réparation en mode lot: les grilles invalides sont régénérées)
+        self.stats["attempts"] += n
+        self.stats["rejected"]["too_few_free"] += int(np.sum(~enough))
+        self.stats["rejected"]["no_path"] += int(np.sum(enough & ~has_path))
+        self.stats["rejected"]["icy_unreachable"] += int(np.sum(valid & ~icy_ok))
+        valid &= icy_ok
+
+        # Vérifier que chaque niveau se gagne à temps, sur les seules grilles encore valides
+        t0 = time.perf_counter()
+        solutions = self._solve_batch(grids, player, goal, time_limit, np.flatnonzero(valid))
+        self.stats["timings"]["solve"] += time.perf_counter() - t0
+        for i, solution in solutions.items():
+            if solution is not None and not solution["winnable"]:
+                self.stats["rejected"]["too_slow"] += 1
+                valid[i] = False
+        self.stats["levels"] += int(np.sum(valid))
+
+        levels = []
+        for i in np.flatnonzero(valid):
+            level = {
+                "level": 1,
+                "difficulty": difficulty,
+                "grid": grids[i].tolist(),
+                "player_pos": player[i].tolist(),
+                "goal_pos": goal[i].tolist(),
+                "time_limit": time_limit,
+                "total_icy": int(icy_mask[i].sum()),
+                "crystals_icy": icy[i][icy_mask[i]].tolist(),
+                "crystals_gold": gold[i][gold_mask[i]].tolist(),
+                "crystals_red": red[i][red_mask[i]].tolist(),
+                "grid_size": size
+            }
+            self._add_solution(level, solutions[i])
+            levels.append(level)
+        return levels
+
+    def _place_obstacles_batch(self, grids: np.ndarray, count: int):
+        """Placer les obstacles sur toutes les grilles, une tentative par grille et par tour"""
+        n, size, _ = grids.shape
+        placed = np.zeros(n, dtype=int)
+        rows = np.arange(n)
+
+        for _ in range(count * 20):
+            active = rows[placed < count]
+            if active.size == 0:
+                break
+
+            kinds = self.np_rng.choice(3, size=active.size, p=[0.5, 0.3, 0.2])
+            x = self.np_rng.integers(1, size - 2, size=active.size)
+            y = self.np_rng.integers(1, size - 2, size=active.size)
+
+            free_00 = grids[active, y, x] == 0
+            free_01 = grids[active, y, x + 1] == 0
+            free_10 = grids[active, y + 1, x] == 0
+            free_11 = grids[active, y + 1, x + 1] == 0
+
+            small = (kinds == 0) & free_00
+            wide = (kinds == 1) & free_00 & free_01
+            square = (kinds == 2) & free_00 & free_01 & free_10 & free_11
+
+            s, w, q = active[small], active[wide], active[square]
+            grids[s, y[small], x[small]] = self.BOX_SMALL
+            grids[w, y[wide], x[wide]] = self.BOX_2X1
+            grids[w, y[wide], x[wide] + 1] = -2
+            grids[q, y[square], x[square]] = self.BOX_2X2
+            grids[q, y[square], x[square] + 1] = -3
+            grids[q, y[square] + 1, x[square]] = -3
+            grids[q, y[square] + 1, x[square] + 1] = -3
+
+            placed[active] += small | wide | square
+
+    def _choose_distant_positions_batch(self, free: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Version vectorisée de _choose_distant_positions, retourne deux tableaux (n, 2) en (x, y)"""
+        n, size, _ = free.shape
+        rows = np.arange(n)
+
+        corners = np.array([(1, 1), (1, size - 2), (size - 2, 1), (size - 2, size - 2)])
+        order = np.argsort(self.np_rng.random((n, 4)), axis=1)
+        shuffled = corners[order]
+        corner_free = free[rows[:, None], shuffled[..., 1], shuffled[..., 0]]
+
+        # Joueur : premier coin libre dans l'ordre mélangé
+        has_player = corner_free.any(axis=1)
+        player = shuffled[rows, np.argmax(corner_free, axis=1)]
+
+        # Fallback: position libre aléatoire
+        missing = np.flatnonzero(~has_player)
+        if missing.size:
+            scores = self.np_rng.random((missing.size, size * size))
+            scores[~free[missing].reshape(missing.size, -1)] = -1.0
+            flat = np.argmax(scores, axis=1)
+            player[missing, 0] = flat % size
+            player[missing, 1] = flat // size
+
+        # Goal : premier coin libre suivant, assez loin du joueur
+        after_player = np.arange(4) > np.argmax(corner_free, axis=1)[:, None]
+        dist = np.abs(shuffled - player[:, None, :]).sum(axis=2)
+        goal_ok = corner_free & after_player & (dist > size // 2) & has_player[:, None]
+        has_goal = goal_ok.any(axis=1)
+        goal = shuffled[rows, np.argmax(goal_ok, axis=1)]
+
+        # Fallback: la position libre la plus éloignée (premier maximum, ordre ligne par ligne)
+        missing = np.flatnonzero(~has_goal)
+        if missing.size:
+            ys, xs = np.mgrid[0:size, 0:size]
+            px = player[missing, 0][:, None, None]
+            py = player[missing, 1][:, None, None]
+            far = np.abs(xs - px) + np.abs(ys - py)
+            far[~free[missing] | (far == 0)] = -1
+            flat = np.argmax(far.reshape(missing.size, -1), axis=1)
+            none_left = far.reshape(missing.size, -1).max(axis=1) < 0
+            goal[missing, 0] = np.where(none_left, player[missing, 0], flat % size)
+            goal[missing, 1] = np.where(none_left, player[missing, 1], flat // size)
+
+        return player, goal
+
+    @staticmethod
+    def _flood_fill_batch(passable: np.ndarray, start: np.ndarray) -> np.ndarray:
+        """Zones atteignables depuis start (n, 2) sur n grilles empilées (propagation 4-voisins)"""
+        rows = np.arange(passable.shape[0])
+        reach = np.zeros_like(passable)
+        reach[rows, start[:, 1], start[:, 0]] = True
+
+        while True:
+            grown = reach.copy()
+            grown[:, 1:, :] |= reach[:, :-1, :]
+            grown[:, :-1, :] |= reach[:, 1:, :]
+            grown[:, :, 1:] |= reach[:, :, :-1]
+            grown[:, :, :-1] |= reach[:, :, 1:]
+            grown &= passable
+            grown[rows, start[:, 1], start[:, 0]] = True
+            if np.array_equal(grown, reach):
+                return reach
+            reach = grown
+
+    def _place_crystals_batch(self, grids: np.ndarray, crystal: int, counts: np.ndarray,
+                              player: np.ndarray, goal: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Placer counts[i] cristaux sur chaque grille i
+        Retourne les positions (n, k, 2) en (x, y) et le masque des positions réellement placées
+        """
+        n, size, _ = grids.shape
+        rows = np.arange(n)
+        k = int(counts.max()) if n else 0
+        if k == 0:
+            return np.zeros((n, 0, 2), dtype=int), np.zeros((n, 0), dtype=bool)
+
+        flat = grids.reshape(n, -1)
+        candidates = flat == self.EMPTY
+        candidates[rows, player[:, 1] * size + player[:, 0]] = False
+        candidates[rows, goal[:, 1] * size + goal[:, 0]] = False
+
+        # Tirage sans remise : les k plus petits scores aléatoires parmi les cellules libres
+        scores = self.np_rng.random(flat.shape)
+        scores[~candidates] = 2.0
+        picks = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        picks = np.take_along_axis(picks, np.argsort(np.take_along_axis(scores, picks, axis=1), axis=1), axis=1)
+
+        mask = (np.arange(k) < counts[:, None]) & np.take_along_axis(candidates, picks, axis=1)
+        flat[np.broadcast_to(rows[:, None], picks.shape)[mask], picks[mask]] = crystal
+
+        positions = np.stack([picks % size, picks // size], axis=2)
+        return positions, mask
+
+    @staticmethod
+    def progressive_difficulty(index: int, count: int) -> int:
+        """Difficulté progressive (1 -> 10) du niveau index sur count"""
+        return 1 + (index * 9) // (count - 1) if count > 1 else 1
     
     def generate_multiple_levels(self, count: int = 35) -> List[Dict]:
         """Générer plusieurs niveaux avec difficulté croissante"""
         levels = []
         
         for i in range(count):
-            # Difficulté progressive
-            difficulty = 1 + (i * 9) // (count - 1) if count > 1 else 1
+            difficulty = self.progressive_difficulty(i, count)
             
             level = self.generate_level(difficulty)
             level["level"] = i + 1
             levels.append(level)
             
-            print(f"✅ Niveau {i + 1}/{count} généré (difficulté: {difficulty})")
+            log.debug("level_generated", "✅ Niveau généré", level=i + 1, count=count,
+                      difficulty=difficulty)
         
         return levels
     
-    def generate_dataset(self, count: int = 3000, output_file: str = "dataset.json") -> List[Dict]:
+    def generate_dataset(self, count: int = 3000, output_file: str = "dataset.json",
+                         seed: Optional[int] = None, workers: Optional[int] = 1,
+                         shard_size: int = 500) -> List[Dict]:
         """
         Générer un dataset de niveaux pour l'entraînement ML
         Inclut des métriques de difficulté
+        
+        Le dataset est découpé en shards de shard_size niveaux, chacun avec une seed
+        dérivée de la seed maître: le résultat ne dépend pas du nombre de workers
+        (workers=None => tous les cœurs, workers=1 => dans ce processus)
         """
-        dataset = []
+        if seed is None:
+            seed = self.rng.randrange(2 ** 32)
         
-        for i in range(count):
-            difficulty = random.randint(1, 10)
-            level = self.generate_level(difficulty)
-            
-            # Ajouter des features pour le ML
-            level["features"] = self._extract_features(level)
-            level["dataset_index"] = i
-            
-            dataset.append(level)
-            
-            if (i + 1) % 100 == 0:
-                print(f"📊 Dataset: {i + 1}/{count} niveaux générés")
+        dataset = list(self.iter_dataset(count, seed, workers, shard_size))
         
         # Sauvegarder
         with open(output_file, 'w') as f:
             json.dump(dataset, f, indent=2)
         
-        print(f"💾 Dataset sauvegardé: {output_file}")
+        log.info("dataset_saved", "💾 Dataset sauvegardé", path=output_file, levels=len(dataset),
+                 seed=seed)
         return dataset
     
+    def generate_dataset_ndjson(self, count: int = 3000, output_file: str = "dataset.ndjson",
+                                seed: Optional[int] = None, workers: Optional[int] = 1,
+                                shard_size: int = 500, chunk_size: int = 100,
+                                resume: bool = True) -> int:
+        """
+        Générer un dataset en streaming vers un fichier NDJSON (mémoire constante)
+        Les paramètres sont notés dans <output_file>.meta.json: avec resume, une
+        génération interrompue reprend après le dernier niveau complet écrit
+        Retourne le nombre de niveaux écrits par cet appel
+        """
+        meta_file = output_file + ".meta.json"
+        start = 0
+        
+        if resume and os.path.exists(meta_file):
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+            expected = {"seed": seed if seed is not None else meta["seed"],
+                        "shard_size": shard_size, "grid_size": self.grid_size,
+                        "moves_per_second": self.moves_per_second}
+            for key, value in expected.items():
+                # moves_per_second absent: dataset écrit avant le solveur, toujours résolu
+                if meta.get(key, MOVES_PER_SECOND) != value:
+                    raise ValueError(
+                        f"Reprise impossible: {key}={value} différent de {meta.get(key)} ({meta_file})"
+                    )
+            seed = meta["seed"]
+            start = count_ndjson(output_file)
+        elif seed is None:
+            seed = self.rng.randrange(2 ** 32)
+        
+        with open(meta_file, 'w') as f:
+            json.dump({"seed": seed, "count": count, "shard_size": shard_size,
+                       "grid_size": self.grid_size, "moves_per_second": self.moves_per_second}, f)
+        
+        if start >= count:
+            return 0
+        if start:
+            log.info("dataset_resumed", "↩️ Reprise du dataset", path=output_file, start=start)
+        
+        written = write_ndjson(self.iter_dataset(count, seed, workers, shard_size, start),
+                               output_file, chunk_size=chunk_size, append=start > 0)
+        
+        log.info("dataset_saved", "💾 Dataset sauvegardé", path=output_file, levels=start + written,
+                 seed=seed)
+        return written
+    
+    def generate_dataset_binary(self, count: int = 3000, output_dir: str = "dataset_bin",
+                                seed: Optional[int] = None, workers: Optional[int] = 1,
+                                shard_size: int = 500, chunk_size: int = 1024) -> int:
+        """
+        Générer un dataset au format binaire (grilles int8, voir dataset_io.BinaryDataset)
+        Retourne le nombre de niveaux écrits
+        """
+        if seed is None:
+            seed = self.rng.randrange(2 ** 32)
+        
+        written = write_binary_dataset(self.iter_dataset(count, seed, workers, shard_size),
+                                       output_dir, chunk_size=chunk_size)
+        
+        log.info("dataset_saved", "💾 Dataset binaire sauvegardé", path=output_dir, levels=written,
+                 seed=seed)
+        return written
+    
+    def iter_dataset(self, count: int, seed: int, workers: Optional[int] = 1,
+                     shard_size: int = 500, start: int = 0) -> Iterator[Dict]:
+        """
+        Produire les niveaux du dataset dans l'ordre, shard par shard
+        start permet de reprendre au milieu: le niveau i est le même quel que soit
+        le point de départ, le count ou le nombre de workers
+        """
+        shards = self._dataset_shards(count, seed, shard_size)[start // shard_size:]
+        skip = start % shard_size
+        
+        if workers == 1:
+            results = (_generate_dataset_shard(*shard) for shard in shards)
+            yield from self._iter_shard_levels(results, skip, count)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Fenêtre bornée de shards en vol: la mémoire ne dépend pas de count
+                window = 2 * (workers or os.cpu_count() or 1)
+                results = self._map_in_order(executor, shards, window)
+                yield from self._iter_shard_levels(results, skip, count)
+    
+    def _dataset_shards(self, count: int, seed: int, shard_size: int) -> List[Tuple]:
+        """Découper le dataset en shards (grid_size, max_retries, seed, start, count, moves_per_second)"""
+        shards = []
+        for index, start in enumerate(range(0, count, shard_size)):
+            # Seed du shard: dépend uniquement de la seed maître et de l'index du shard
+            sequence = np.random.SeedSequence(seed, spawn_key=(index,))
+            shard_seed = int(sequence.generate_state(1, dtype=np.uint64)[0])
+            shards.append((self.grid_size, self.max_retries, shard_seed,
+                           start, min(shard_size, count - start), self.moves_per_second))
+        return shards
+    
+    @staticmethod
+    def _map_in_order(executor: ProcessPoolExecutor, shards: List[Tuple],
+                      window: int) -> Iterator[Tuple[List[Dict], Dict]]:
+        """Comme executor.map, mais avec au plus window shards soumis d'avance"""
+        pending = deque()
+        for shard in shards:
+            pending.append(executor.submit(_generate_dataset_shard, *shard))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    
+    def _iter_shard_levels(self, results, skip: int, count: int) -> Iterator[Dict]:
+        """Enchaîner les niveaux des shards dans l'ordre et cumuler leurs statistiques"""
+        for levels, stats in results:
+            self.merge_stats(stats)
+            yield from levels[skip:]
+            skip = 0
+            log.info("dataset_progress", "📊 Dataset", generated=levels[-1]['dataset_index'] + 1,
+                     count=count)
+    
+    def merge_stats(self, stats: Dict):
+        """Ajouter les compteurs d'un autre générateur (ex: un worker)"""
+        self.stats["levels"] += stats["levels"]
+        self.stats["attempts"] += stats["attempts"]
+        for reason in self.REJECTION_REASONS:
+            self.stats["rejected"][reason] += stats["rejected"][reason]
+            self.stats["repaired"][reason] += stats["repaired"][reason]
+        for stage, seconds in stats.get("timings", {}).items():
+            self.stats["timings"][stage] += seconds
+    
     def _extract_features(self, level: Dict) -> Dict:
         """Extraire les features pour le ML"""
         grid = np.array(level["grid"])
@@ -306,6 +822,7 @@ class LevelGenerator:
             "num_crystals_red": len(level["crystals_red"]),
             "time_limit": level["time_limit"],
             "manhattan_distance": manhattan_dist,
+            "min_moves": level.get("min_moves"),
             "free_space_ratio": round(free_space, 3),
             "difficulty": level["difficulty"]
         }
@@ -314,20 +831,115 @@ class LevelGenerator:
         """Sauvegarder les niveaux dans un fichier JSON"""
         with open(filename, 'w') as f:
             json.dump(levels, f, indent=2)
-        print(f"💾 {len(levels)} niveaux sauvegardés dans {filename}")
+        log.info("levels_saved", "💾 Niveaux sauvegardés", path=filename, levels=len(levels))
     
     def load_levels_from_json(self, filename: str = "levels.json") -> List[Dict]:
         """Charger les niveaux depuis un fichier JSON"""
         try:
             with open(filename, 'r') as f:
                 levels = json.load(f)
-            print(f"📂 {len(levels)} niveaux chargés depuis {filename}")
+            log.info("levels_loaded", "📂 Niveaux chargés", path=filename, levels=len(levels))
             return levels
         except FileNotFoundError:
-            print(f"❌ Fichier {filename} non trouvé")
+            log.warning("levels_missing", "❌ Fichier non trouvé", path=filename)
             return []
 
 
+# ===== WORKERS =====
+def _generate_dataset_shard(grid_size: int, max_retries: int, seed: int, start: int, count: int,
+                            moves_per_second: Optional[float] = MOVES_PER_SECOND) -> Tuple[List[Dict], Dict]:
+    """Générer un shard du dataset (exécuté dans un processus du pool)"""
+    generator = LevelGenerator(grid_size=grid_size, max_retries=max_retries, seed=seed,
+                               moves_per_second=moves_per_second)
+    levels = []
+    
+    for i in range(count):
+        difficulty = generator.rng.randint(1, 10)
+        level = generator.generate_level(difficulty)
+        
+        # Ajouter des features pour le ML
+        level["features"] = generator._extract_features(level)
+        level["dataset_index"] = start + i
+        
+        levels.append(level)
+    
+    return levels, generator.get_stats()
+
+
+def generate_level_task(grid_size: int, difficulty: int, seed: Optional[int] = None,
+                        moves_per_second: Optional[float] = MOVES_PER_SECOND) -> Tuple[Dict, Dict]:
+    """Générer un niveau hors de la boucle asyncio (thread ou processus du pool)"""
+    generator = LevelGenerator(grid_size=grid_size, seed=seed, moves_per_second=moves_per_second)
+    level = generator.generate_level(difficulty)
+    return level, generator.get_stats()
+
+
+# ===== INDEX D'ACCESSIBILITÉ =====
+class ReachabilityIndex:
+    """
+    Zones atteignables depuis une position, calculées en un seul remplissage
+    Chaque mode (cristaux rouges bloquants ou non) est calculé à la première requête,
+    ensuite chaque test "X est-il atteignable ?" est en O(1)
+    """
+    
+    # Cellules bloquantes selon le mode ignore_crystals
+    BLOCKING = {
+        False: LevelGenerator.WALLS + (LevelGenerator.CRYSTAL_RED,),
+        True: LevelGenerator.WALLS
+    }
+    
+    def __init__(self, grid, start: Tuple):
+        self.grid = np.asarray(grid)
+        self.start = tuple(start)
+        self.height, self.width = self.grid.shape
+        # Bordure d'une cellule: pas de test de limites dans le remplissage
+        self.stride = self.width + 2
+        self._reach = {}
+    
+    def reachable(self, pos: Tuple, ignore_crystals: bool = False) -> bool:
+        """La position est-elle atteignable depuis start ?"""
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return bool(self._mask(ignore_crystals)[(y + 1) * self.stride + x + 1])
+    
+    def cells(self, ignore_crystals: bool = False) -> List[Tuple]:
+        """Toutes les positions atteignables, dans l'ordre ligne par ligne"""
+        mask = self._mask(ignore_crystals)
+        flat = np.flatnonzero(np.frombuffer(bytes(mask), dtype=np.uint8))
+        return [(int(i % self.stride) - 1, int(i // self.stride) - 1) for i in flat]
+    
+    def _mask(self, ignore_crystals: bool) -> bytearray:
+        mask = self._reach.get(ignore_crystals)
+        if mask is None:
+            mask = self._flood_fill(ignore_crystals)
+            self._reach[ignore_crystals] = mask
+        return mask
+    
+    def _flood_fill(self, ignore_crystals: bool) -> bytearray:
+        """Remplissage sur un tableau plat d'octets (cellules passables = 1)"""
+        passable = np.zeros((self.height + 2, self.stride), dtype=np.uint8)
+        passable[1:-1, 1:-1] = ~np.isin(self.grid, self.BLOCKING[ignore_crystals])
+        passable = passable.tobytes()
+        
+        stride = self.stride
+        offsets = (1, -1, stride, -stride)
+        start = (self.start[1] + 1) * stride + self.start[0] + 1
+        reach = bytearray(len(passable))
+        reach[start] = 1
+        stack = [start]
+        
+        while stack:
+            i = stack.pop()
+            for offset in offsets:
+                j = i + offset
+                if passable[j] and not reach[j]:
+                    reach[j] = 1
+                    stack.append(j)
+        
+        return reach
+
+
 # ===== SIMPLE GENERATOR (Compatibilité) =====
 class SimpleGenerator:
     """
@@ -357,6 +969,7 @@ class SimpleGenerator:
 
 # ===== TEST =====
 if __name__ == "__main__":
+    setup_logging()
     generator = LevelGenerator(grid_size=15)
     
     # Générer un niveau test
@@ -0,0 +1,148 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from level_generator import LevelGenerator
+from level_pool import LevelPool
+from event_log import get_logger
+
+log = get_logger("levels")
+
+
+class GenerationJob:
+    """État d'une génération de niveaux en arrière-plan"""
+
+    def __init__(self, count: int, save: bool):
+        self.id = uuid.uuid4().hex
+        self.count = count
+        self.save = save
+        self.status = "pending"   # pending -> running -> done | failed
+        self.generated = 0
+        self.saved = 0
+        self.error: Optional[str] = None
+        # Niveaux d'un job sans sauvegarde, rendus par to_dict une fois terminé (au plus max_count)
+        self.levels: Optional[List[Dict]] = None
+
+        # Compteurs de tentatives/rejets cumulés sur tous les niveaux du job
+        self.generator = LevelGenerator()
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.generation_seconds = 0.0
+        self.save_seconds = 0.0
+
+    def to_dict(self) -> Dict:
+        stats = self.generator.get_stats()
+        result = {
+            "job_id": self.id,
+            "status": self.status,
+            "count": self.count,
+            "generated": self.generated,
+            "saved": self.saved,
+            "progress": round(self.generated / self.count, 3) if self.count else 1.0,
+            "retries": stats["attempts"] - stats["levels"],
+            "rejected": stats["rejected"],
+            "repaired": stats["repaired"],
+            "timings": {
+                "queued": round((self.started_at or time.time()) - self.created_at, 3),
+                "generation": round(self.generation_seconds, 3),
+                "save": round(self.save_seconds, 3),
+                "total": round((self.finished_at or time.time()) - self.created_at, 3)
+            },
+            "error": self.error
+        }
+        if self.levels is not None:
+            result["levels"] = self.levels
+        return result
+
+
+class LevelJobManager:
+    """
+    Lance les générations de niveaux en tâche de fond
+    Les niveaux sont générés sur l'executor de la réserve puis sauvegardés en un seul lot.
+    Tous jobs confondus, au plus concurrency niveaux attendent l'executor (par défaut un
+    par worker): les remplissages de la réserve passent entre deux niveaux d'un job.
+    """
+
+    def __init__(self, db, level_pool: LevelPool,
+                 on_saved: Optional[Callable[[List[Dict]], None]] = None,
+                 max_jobs: int = 50, max_count: int = 1000,
+                 concurrency: Optional[int] = None):
+        self.db = db
+        self.level_pool = level_pool
+        self.on_saved = on_saved
+        self.max_jobs = max_jobs
+        self.max_count = max_count
+        self._slots = asyncio.Semaphore(concurrency or max(1, level_pool.workers))
+        self.jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+        self._tasks = set()
+
+    def submit(self, count: int, save: bool = True) -> GenerationJob:
+        """Créer un job et le lancer sans l'attendre"""
+        if not 1 <= count <= self.max_count:
+            raise ValueError(f"count doit être entre 1 et {self.max_count}")
+        job = GenerationJob(count, save)
+        self.jobs[job.id] = job
+
+        # Ne garder que les derniers jobs terminés
+        while len(self.jobs) > self.max_jobs:
+            oldest = next(iter(self.jobs.values()))
+            if oldest.status in ("pending", "running"):
+                break
+            self.jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self.jobs.get(job_id)
+
+    async def _run(self, job: GenerationJob):
+        job.status = "running"
+        job.started_at = time.time()
+
+        try:
+            levels = await self._generate(job)
+            job.generation_seconds = time.time() - job.started_at
+
+            if job.save:
+                save_start = time.time()
+                job.saved = await self.db.save_levels(levels)
+                # Sauvegarder aussi en JSON (hors de la boucle)
+                await asyncio.to_thread(job.generator.save_levels_to_json, levels, "levels.json")
+                job.save_seconds = time.time() - save_start
+                if self.on_saved:
+                    self.on_saved(levels)
+            else:
+                job.levels = levels
+
+            job.status = "done"
+            log.info("level_job_done", "✅ Job terminé", job=job.id, generated=job.generated,
+                     saved=job.saved)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            log.error("level_job_failed", "❌ Job en échec", job=job.id, error=repr(e))
+        finally:
+            job.finished_at = time.time()
+
+    async def _generate(self, job: GenerationJob) -> List[Dict]:
+        """Générer tous les niveaux du job sur l'executor, concurrency à la fois"""
+        levels: List[Optional[Dict]] = [None] * job.count
+
+        async def generate_one(index: int):
+            difficulty = LevelGenerator.progressive_difficulty(index, job.count)
+            async with self._slots:
+                level, stats = await self.level_pool.generate(difficulty)
+            level["level"] = index + 1
+            levels[index] = level
+            job.generator.merge_stats(stats)
+            job.generated += 1
+
+        await asyncio.gather(*(generate_one(i) for i in range(job.count)))
+        return levels
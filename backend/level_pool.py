@@ -0,0 +1,136 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from level_generator import LevelGenerator, generate_level_task
+from metrics import observe_generation
+from solver import MOVES_PER_SECOND
+from event_log import get_logger
+
+log = get_logger("levels")
+
+
+class LevelPool:
+    """
+    Réserve de niveaux pré-générés par difficulté
+    Le remplissage tourne dans un pool de processus (ou de threads):
+    la boucle asyncio ne fait qu'attendre un niveau prêt
+    """
+
+    def __init__(self, grid_size: int = 15, size: int = 2,
+                 difficulties: Iterable[int] = range(1, 11),
+                 workers: int = 1, use_processes: bool = True,
+                 moves_per_second: Optional[float] = MOVES_PER_SECOND):
+        self.grid_size = grid_size
+        # Rythme du joueur pour le solveur (None = niveaux non vérifiés)
+        self.moves_per_second = moves_per_second
+        self.size = size
+        self.difficulties = list(difficulties)
+        self.workers = workers
+        self.use_processes = use_processes
+
+        self.queues: Dict[int, asyncio.Queue] = {}
+        self._tasks = []
+        self._executor: Optional[Executor] = None
+        self._pending: Set[asyncio.Future] = set()   # générations en cours sur l'executor
+
+        # Générateur local: ne génère rien, cumule les compteurs des workers
+        self._generator = LevelGenerator(grid_size=grid_size, moves_per_second=moves_per_second)
+
+    async def start(self):
+        """Créer l'executor et lancer une tâche de remplissage par difficulté"""
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="level-pool")
+
+        for difficulty in self.difficulties:
+            self.queues[difficulty] = asyncio.Queue(maxsize=self.size)
+            self._tasks.append(asyncio.create_task(self._refill(difficulty)))
+
+        log.info("level_pool_started", "🧊 Réserve de niveaux démarrée", size=self.size,
+                 workers=self.workers)
+
+    async def stop(self):
+        """Arrêter le remplissage, les générations en cours et l'executor"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        # Générations demandées hors réserve (jobs): celles pas encore lancées sont annulées
+        for future in list(self._pending):
+            future.cancel()
+
+        if self._executor:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=False, cancel_futures=True)
+            if isinstance(executor, ProcessPoolExecutor):
+                self._terminate_workers(executor)
+
+    @staticmethod
+    def _terminate_workers(executor: ProcessPoolExecutor):
+        """
+        Arrêter les workers sans attendre leur niveau en cours (perdu de toute façon)
+        Un worker forké garde l'extrémité d'écriture de sa file de tâches: si le serveur
+        meurt avant lui, il attend indéfiniment et garde le socket d'écoute hérité.
+        """
+        terminate = getattr(executor, "terminate_workers", None)   # Python 3.14+
+        if terminate:
+            terminate()
+            return
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+
+    async def get(self, difficulty: int) -> Dict:
+        """Prendre un niveau prêt (attend le prochain si la réserve est vide)"""
+        queue = self.queues.get(difficulty)
+        if queue is None:
+            # Difficulté hors réserve ou pool arrêté: générer hors de la boucle
+            return await self._generate(difficulty)
+        return await queue.get()
+
+    def get_stats(self) -> Dict:
+        """Tentatives et rejets cumulés de tous les niveaux générés par la réserve"""
+        return self._generator.get_stats()
+
+    def ready(self) -> int:
+        """Nombre total de niveaux prêts"""
+        return sum(queue.qsize() for queue in self.queues.values())
+
+    async def generate(self, difficulty: int) -> Tuple[Dict, Dict]:
+        """Générer un niveau sur l'executor de la réserve, sans passer par les files"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, generate_level_task, self.grid_size, difficulty, None,
+            self.moves_per_second
+        )
+        self._pending.add(future)
+        try:
+            level, stats = await future
+        finally:
+            self._pending.discard(future)
+        observe_generation(stats)
+        return level, stats
+
+    async def _refill(self, difficulty: int):
+        queue = self.queues[difficulty]
+        while True:
+            try:
+                level = await self._generate(difficulty)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("level_pool_failed", "❌ Réserve de niveaux", difficulty=difficulty,
+                          error=repr(e))
+                await asyncio.sleep(1.0)
+                continue
+            # Bloque tant que la réserve est pleine
+            await queue.put(level)
+
+    async def _generate(self, difficulty: int) -> Dict:
+        level, stats = await self.generate(difficulty)
+        self._generator.merge_stats(stats)
+        return level
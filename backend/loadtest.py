@@ -0,0 +1,322 @@
+"""
+Test de charge de /ws/game: N joueurs simulés en asyncio
+
+    python loadtest.py --spawn --players 500 --duration 30
+    python loadtest.py --url ws://localhost:8000/ws/game --players 2000 --ramp 20
+
+--spawn lance un serveur local (uvicorn, DATABASE_BACKEND=memory) et mesure son CPU.
+Chaque joueur envoie init, joue des mouvements (aléatoires parmi les cases libres, ou --script),
+puis restart / next_level. Rapport: aller-retour des mouvements et des chargements de niveau
+(p50/p99), gigue des timer_update, messages par seconde, CPU du serveur.
+
+Au-delà de ~1000 joueurs, augmenter la limite de fichiers ouverts (ulimit -n).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+import websockets
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DIRECTIONS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+WALLS = (1, 2, 3)
+
+# Réponses possibles à un move (un move bloqué ne reçoit rien)
+MOVE_REPLIES = ("update", "crystal_collected", "victory", "need_crystals", "game_over")
+
+
+class Stats:
+    """Mesures cumulées de tous les joueurs"""
+
+    def __init__(self):
+        self.move_rtt: List[float] = []
+        self.level_rtt: List[float] = []
+        self.timer_jitter: List[float] = []
+        self.sent = 0
+        self.received = 0
+        self.timeouts = 0
+        self.victories = 0
+        self.game_overs = 0
+        self.connected = 0
+        self.errors = 0
+
+
+class Player:
+    """Un client /ws/game: lit tous les messages et joue en boucle fermée"""
+
+    def __init__(self, index: int, args, stats: Stats):
+        self.index = index
+        self.args = args
+        self.stats = stats
+        self.rng = random.Random(args.seed + index)
+        self.ws = None
+        self.waiting: Optional[asyncio.Future] = None
+        self.waiting_for = ()
+        self.last_timer: Optional[float] = None
+        self.grid: List[List[int]] = []
+        self.player_pos = [0, 0]
+        self.script_index = 0
+
+    async def run(self, deadline: float):
+        try:
+            async with websockets.connect(self.args.url, max_size=None) as ws:
+                self.ws = ws
+                self.stats.connected += 1
+                reader = asyncio.create_task(self._read())
+                try:
+                    await self._play(deadline)
+                finally:
+                    reader.cancel()
+                    await asyncio.gather(reader, return_exceptions=True)
+        except Exception as e:
+            self.stats.errors += 1
+            if self.stats.errors <= 5:
+                print(f"❌ Joueur {self.index}: {e}", file=sys.stderr)
+
+    # ===== ENVOI =====
+    async def _request(self, message: Dict, replies: tuple, rtt: List[float]) -> Optional[Dict]:
+        """Envoyer un message et attendre la réponse correspondante (aller-retour mesuré)"""
+        loop = asyncio.get_running_loop()
+        self.waiting = loop.create_future()
+        self.waiting_for = replies
+        start = time.perf_counter()
+        await self.ws.send(json.dumps(message))
+        self.stats.sent += 1
+        try:
+            reply = await asyncio.wait_for(self.waiting, self.args.timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            return None
+        finally:
+            self.waiting = None
+        rtt.append(time.perf_counter() - start)
+        return reply
+
+    async def _load(self, action: str):
+        message = {"action": action}
+        if action == "init":
+            message["username"] = f"{self.args.prefix}{self.index}"
+        await self._request(message, ("init",), self.stats.level_rtt)
+
+    async def _play(self, deadline: float):
+        await self._load("init")
+        interval = 1.0 / self.args.move_rate
+        moves = 0
+
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            direction = self._next_direction()
+            if direction is None:
+                await self._load("restart")
+            else:
+                reply = await self._request({"action": "move", "direction": direction},
+                                            MOVE_REPLIES, self.stats.move_rtt)
+                moves += 1
+                if reply and reply["type"] == "victory":
+                    self.stats.victories += 1
+                    await self._load("next_level")
+                elif reply and reply["type"] == "game_over":
+                    self.stats.game_overs += 1
+                    await self._load("restart")
+                elif self.args.next_level_every and moves % self.args.next_level_every == 0:
+                    await self._load("next_level")
+                elif self.args.restart_every and moves % self.args.restart_every == 0:
+                    await self._load("restart")
+
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+    def _next_direction(self) -> Optional[str]:
+        """Prochain mouvement: le script, ou une direction qui reçoit forcément une réponse"""
+        if self.args.script:
+            direction = self.args.script[self.script_index % len(self.args.script)]
+            self.script_index += 1
+            return direction
+
+        x, y = self.player_pos
+        options = []
+        for direction, (dx, dy) in DIRECTIONS.items():
+            nx, ny = x + dx, y + dy
+            if 0 <= ny < len(self.grid) and 0 <= nx < len(self.grid[0]) and self.grid[ny][nx] not in WALLS:
+                options.append(direction)
+        return self.rng.choice(options) if options else None
+
+    # ===== RÉCEPTION =====
+    async def _read(self):
+        async for raw in self.ws:
+            self.stats.received += 1
+            message = json.loads(raw)
+            kind = message.get("type")
+
+            if kind == "timer_update":
+                now = time.perf_counter()
+                if self.last_timer is not None:
+                    expected = 1.0 / self.args.timer_rate
+                    self.stats.timer_jitter.append(abs((now - self.last_timer) - expected))
+                self.last_timer = now
+                continue
+
+            self._track(message)
+            if self.waiting is not None and not self.waiting.done() and kind in self.waiting_for:
+                self.waiting.set_result(message)
+
+    def _track(self, message: Dict):
+        """Garder la grille et la position à jour pour choisir des mouvements valides"""
+        kind = message.get("type")
+        if kind in ("init", "grid_sync"):
+            self.grid = message["grid"]
+            self.last_timer = None
+        for x, y, value in message.get("changes", ()):
+            self.grid[y][x] = value
+        if "player_pos" in message:
+            self.player_pos = message["player_pos"]
+
+
+# ===== SERVEUR LOCAL =====
+def spawn_server(port: int) -> subprocess.Popen:
+    """Lancer websocket_server avec la base en mémoire et attendre qu'il réponde"""
+    env = dict(os.environ, DATABASE_BACKEND="memory")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "websocket_server:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL
+    )
+
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError("le serveur s'est arrêté au démarrage")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError("le serveur ne répond pas")
+
+
+def cpu_seconds(pid: int) -> Optional[float]:
+    """Temps CPU (utilisateur + système) consommé par un processus"""
+    if psutil:
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ===== RAPPORT =====
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(stats: Stats, elapsed: float, cpu: Optional[float], players: int):
+    ms = 1000.0
+    print(f"\n📊 {players} joueurs, {stats.connected} connectés, {stats.errors} erreurs, {elapsed:.1f}s")
+    print(f"   mouvements        {len(stats.move_rtt):>8}  "
+          f"p50 {percentile(stats.move_rtt, 0.5) * ms:7.2f} ms  p99 {percentile(stats.move_rtt, 0.99) * ms:7.2f} ms")
+    print(f"   niveaux chargés   {len(stats.level_rtt):>8}  "
+          f"p50 {percentile(stats.level_rtt, 0.5) * ms:7.2f} ms  p99 {percentile(stats.level_rtt, 0.99) * ms:7.2f} ms")
+    print(f"   gigue timer       {len(stats.timer_jitter):>8}  "
+          f"p50 {percentile(stats.timer_jitter, 0.5) * ms:7.2f} ms  p99 {percentile(stats.timer_jitter, 0.99) * ms:7.2f} ms")
+    print(f"   messages/s        envoyés {stats.sent / elapsed:9.0f}  reçus {stats.received / elapsed:9.0f}")
+    print(f"   sans réponse      {stats.timeouts}")
+    print(f"   victoires         {stats.victories}  game over {stats.game_overs}")
+    if cpu is not None:
+        print(f"   CPU serveur       {cpu / elapsed * 100:.0f}% d'un cœur")
+
+
+async def run(args, server_pid: Optional[int]):
+    stats = Stats()
+    cpu_start = cpu_seconds(server_pid) if server_pid else None
+    start = time.perf_counter()
+    deadline = start + args.ramp + args.duration
+
+    async def start_player(index: int):
+        # Connexions étalées sur la durée de montée en charge
+        await asyncio.sleep(args.ramp * index / args.players)
+        await Player(index, args, stats).run(deadline)
+
+    await asyncio.gather(*(start_player(i) for i in range(args.players)))
+
+    elapsed = time.perf_counter() - start
+    cpu = None
+    if cpu_start is not None:
+        cpu_end = cpu_seconds(server_pid)
+        cpu = cpu_end - cpu_start if cpu_end is not None else None
+    report(stats, elapsed, cpu, args.players)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Test de charge du WebSocket /ws/game")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/game")
+    parser.add_argument("--spawn", action="store_true", help="lancer un serveur local (base en mémoire)")
+    parser.add_argument("--port", type=int, default=8765, help="port du serveur lancé par --spawn")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID du serveur pour mesurer son CPU")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=20.0, help="secondes de jeu après la montée en charge")
+    parser.add_argument("--ramp", type=float, default=5.0, help="secondes pour connecter tous les joueurs")
+    parser.add_argument("--move-rate", type=float, default=5.0, help="mouvements par seconde et par joueur")
+    parser.add_argument("--timer-rate", type=float, default=float(os.getenv("TIMER_UPDATE_RATE", 10)),
+                        help="fréquence attendue des timer_update (Hz)")
+    parser.add_argument("--script", default=None, help="directions jouées en boucle (ex: right,right,down)")
+    parser.add_argument("--restart-every", type=int, default=0, help="restart tous les N mouvements")
+    parser.add_argument("--next-level-every", type=int, default=0, help="next_level tous les N mouvements")
+    parser.add_argument("--timeout", type=float, default=2.0, help="attente maximale d'une réponse (s)")
+    parser.add_argument("--prefix", default="load", help="préfixe des noms de joueurs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.script:
+        args.script = [direction.strip() for direction in args.script.split(",") if direction.strip()]
+
+    server = None
+    server_pid = args.server_pid
+    if args.spawn:
+        server = spawn_server(args.port)
+        server_pid = server.pid
+        args.url = f"ws://127.0.0.1:{args.port}/ws/game"
+        print(f"🚀 Serveur local lancé (pid {server.pid}) sur {args.url}")
+
+    try:
+        asyncio.run(run(args, server_pid))
+    finally:
+        stopped = stop_server(server) if server else True
+    return 0 if stopped else 1
+
+
+def stop_server(server: subprocess.Popen, timeout: float = 10.0) -> bool:
+    """Arrêter le serveur lancé par --spawn; False s'il a fallu le tuer (arrêt bloqué)"""
+    server.terminate()
+    try:
+        server.wait(timeout=timeout)
+        return True
+    except subprocess.TimeoutExpired:
+        # Dernier recours: l'arrêt propre est bloqué, c'est un bug du serveur à corriger
+        server.kill()
+        server.wait()
+        print(f"❌ Le serveur ne s'est pas arrêté en {timeout:.0f}s après SIGTERM: tué (SIGKILL)",
+              file=sys.stderr)
+        return False
+
+
+if __name__ == "__main__":
+    sys.exit(main())
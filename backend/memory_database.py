@@ -0,0 +1,139 @@
+import copy
+import itertools
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from storage import Storage, project_level
+from event_log import get_logger
+
+log = get_logger("storage")
+
+
+class MemoryDatabase(Storage):
+    """
+    Backend en mémoire, sans service externe
+    Les niveaux sont copiés à l'écriture et à la lecture, comme des documents MongoDB
+    """
+
+    def __init__(self):
+        self.users: Dict[str, Dict] = {}
+        self.levels: Dict[int, Dict] = {}
+        self._ids = itertools.count(1)
+        log.info("storage_opened", "📦 Base de données en mémoire", backend="memory")
+
+    # ===== UTILISATEURS =====
+    async def create_user(self, username: str, password: str) -> Dict:
+        if username in self.users:
+            return {"success": False, "message": "Ce nom d'utilisateur existe déjà"}
+
+        user = {
+            "id": str(next(self._ids)),
+            "username": username,
+            "password_hash": self._hash_password(password),
+            "created_at": datetime.utcnow(),
+            "total_gold": 0,
+            "levels_completed": 0,
+            "current_level": 1
+        }
+        self.users[username] = user
+        return {"success": True, "user": self._public(user)}
+
+    async def verify_user(self, username: str, password: str) -> Dict:
+        user = self.users.get(username)
+
+        if not user:
+            return {"success": False, "message": "Utilisateur non trouvé"}
+
+        if user["password_hash"] != self._hash_password(password):
+            return {"success": False, "message": "Mot de passe incorrect"}
+
+        return {"success": True, "user": self._public(user)}
+
+    async def update_user_gold(self, username: str, gold_collected: int) -> bool:
+        return await self.apply_user_increments({username: (gold_collected, 1)}) > 0
+
+    async def apply_user_increments(self, increments: Dict[str, tuple]) -> int:
+        modified = 0
+        for username, (gold, completed) in increments.items():
+            user = self.users.get(username)
+            if user:
+                user["total_gold"] += gold
+                user["levels_completed"] += completed
+                modified += 1
+        return modified
+
+    async def get_user_stats(self, username: str) -> Optional[Dict]:
+        user = self.users.get(username)
+        if not user:
+            return None
+        return {
+            "username": username,
+            "total_gold": user["total_gold"],
+            "levels_completed": user["levels_completed"]
+        }
+
+    async def update_user_level(self, username: str, level: int) -> bool:
+        user = self.users.get(username)
+        if not user:
+            return False
+        user["current_level"] = level
+        return True
+
+    # ===== LEADERBOARD =====
+    async def get_leaderboard(self, limit: int = 50) -> List[Dict]:
+        users = sorted(self.users.values(), key=lambda user: -user["total_gold"])[:limit]
+        return [
+            {
+                "username": user["username"],
+                "total_gold": user["total_gold"],
+                "levels_completed": user["levels_completed"]
+            }
+            for user in users
+        ]
+
+    # ===== NIVEAUX =====
+    async def save_level(self, level_data: Dict) -> bool:
+        level_num = level_data.get("level", 1)
+        # Upsert avec la sémantique de $set: les champs existants sont remplacés
+        level = self.levels.setdefault(level_num, {})
+        level.update(copy.deepcopy(level_data))
+        return True
+
+    async def save_levels(self, levels: List[Dict]) -> int:
+        for level in levels:
+            await self.save_level(level)
+        return len(levels)
+
+    async def get_level(self, level_num: int) -> Optional[Dict]:
+        level = self.levels.get(level_num)
+        return copy.deepcopy(level) if level else None
+
+    async def get_all_levels(self) -> List[Dict]:
+        return [copy.deepcopy(self.levels[num]) for num in sorted(self.levels)]
+
+    async def iter_levels(self, after: Optional[int] = None, limit: Optional[int] = None,
+                          fields: Optional[Iterable[str]] = None) -> AsyncIterator[Dict]:
+        fields = None if fields is None else set(fields)
+        count = 0
+        for num in sorted(self.levels):
+            if after is not None and num <= after:
+                continue
+            if limit and count >= limit:
+                break
+            count += 1
+            yield copy.deepcopy(project_level(self.levels[num], fields))
+
+    async def delete_all_levels(self) -> int:
+        count = len(self.levels)
+        self.levels.clear()
+        return count
+
+    @staticmethod
+    def _public(user: Dict) -> Dict:
+        return {
+            "id": user["id"],
+            "username": user["username"],
+            "total_gold": user["total_gold"],
+            "levels_completed": user["levels_completed"],
+            "current_level": user["current_level"]
+        }
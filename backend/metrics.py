@@ -0,0 +1,280 @@
+"""
+Métriques du serveur au format texte Prometheus (GET /metrics)
+
+Enregistrement prévu pour rester actif en production: un observe() d'histogramme est
+une recherche dichotomique dans les bornes plus deux additions, sans verrou ni allocation
+(tout tourne sur la boucle asyncio). Les jauges peuvent lire leur valeur au moment du
+rendu (set_function), sans rien coûter entre deux scrapes.
+"""
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bornes par défaut (secondes): de 50 µs à 10 s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    """Base commune: nom, aide, étiquettes et enfants par valeurs d'étiquettes"""
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "Metric"] = {}
+
+    def labels(self, **labels) -> "Metric":
+        """Série pour ces valeurs d'étiquettes (à garder de côté sur les chemins chauds)"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._child()
+        return child
+
+    def _child(self) -> "Metric":
+        raise NotImplementedError
+
+    def _series(self) -> List[Tuple[Tuple[Tuple[str, str], ...], "Metric"]]:
+        if not self.labelnames:
+            return [((), self)]
+        return [(tuple(zip(self.labelnames, key)), child) for key, child in self._children.items()]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, series in self._series():
+            lines.extend(series._samples(self.name, labels))
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self.value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _child(self) -> "Counter":
+        return Counter(self.name, self.help)
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Lire la valeur ailleurs (compteur existant) au moment du rendu"""
+        self._function = function
+
+    def _samples(self, name: str, labels) -> List[str]:
+        value = self._function() if self._function else self.value
+        return [f"{name}{format_labels(labels)} {format_value(value)}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def _child(self) -> "Gauge":
+        return Gauge(self.name, self.help)
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # dernier = au-delà de la plus grande borne
+        self.sum = 0.0
+
+    def _child(self) -> "Histogram":
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def _samples(self, name: str, labels) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(bound)),))} {cumulative}")
+        cumulative += self.counts[-1]
+        lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(self.sum)}")
+        lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Ensemble des métriques exposées par /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+# ===== MÉTRIQUES DU SERVEUR =====
+REGISTRY = Registry()
+
+MOVE_SECONDS = REGISTRY.histogram(
+    "pathmind_move_seconds", "Traitement d'un message move/moves, envoi de la réponse compris",
+    ("action",)
+)
+LOAD_LEVEL_SECONDS = REGISTRY.histogram(
+    "pathmind_load_level_seconds", "Chargement d'un niveau (init, restart, next_level)"
+)
+DB_SECONDS = REGISTRY.histogram(
+    "pathmind_db_seconds", "Appels au stockage par opération", ("operation",)
+)
+DB_ERRORS = REGISTRY.counter(
+    "pathmind_db_errors_total", "Appels au stockage en erreur", ("operation",)
+)
+GENERATE_SECONDS = REGISTRY.histogram(
+    "pathmind_generate_level_seconds",
+    "Génération d'un niveau par étape (toutes tentatives confondues), total compris",
+    ("stage",)
+)
+GENERATE_RETRIES = REGISTRY.histogram(
+    "pathmind_generate_level_retries", "Tentatives en trop par niveau généré",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+GENERATE_REJECTED = REGISTRY.counter(
+    "pathmind_generate_rejected_total", "Candidats rejetés par raison", ("reason",)
+)
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    "pathmind_active_sessions", "Sessions de jeu connectées"
+)
+LEVEL_POOL_READY = REGISTRY.gauge(
+    "pathmind_level_pool_ready", "Niveaux prêts dans la réserve"
+)
+SEND_QUEUE = REGISTRY.gauge(
+    "pathmind_send_queue_depth", "Messages de jeu en cours d'envoi (en attente du socket)"
+)
+LEVEL_CACHE = REGISTRY.counter(
+    "pathmind_level_cache_total", "Lectures du cache de niveaux", ("result",)
+)
+RESPONSE_CACHE = REGISTRY.counter(
+    "pathmind_response_cache_total", "Lectures du cache HTTP", ("result",)
+)
+LEADERBOARD_SUBSCRIBERS = REGISTRY.gauge(
+    "pathmind_leaderboard_subscribers", "Abonnés à /ws/leaderboard"
+)
+LOG_DROPPED = REGISTRY.counter(
+    "pathmind_log_dropped_total", "Logs abandonnés, file d'écriture pleine"
+)
+
+
+def observe_generation(stats: Dict):
+    """Enregistrer les stats d'un niveau généré (retour de generate_level_task)"""
+    timings = stats.get("timings", {})
+    for stage, seconds in timings.items():
+        GENERATE_SECONDS.labels(stage=stage).observe(seconds)
+    GENERATE_SECONDS.labels(stage="total").observe(sum(timings.values()))
+    GENERATE_RETRIES.observe(stats["attempts"] - stats["levels"])
+    for reason, count in stats["rejected"].items():
+        if count:
+            GENERATE_REJECTED.labels(reason=reason).inc(count)
+
+
+def instrument_storage(storage):
+    """Chronométrer chaque méthode async du stockage (pathmind_db_seconds{operation})"""
+    for name, method in inspect.getmembers(storage, inspect.ismethod):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(method):
+            timed = _timed
+        elif inspect.isasyncgenfunction(method):
+            timed = _timed_iteration
+        else:
+            continue
+        setattr(storage, name, timed(method, DB_SECONDS.labels(operation=name),
+                                     DB_ERRORS.labels(operation=name)))
+    return storage
+
+
+def _timed(method, histogram: Histogram, errors: Counter):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+
+def _timed_iteration(method, histogram: Histogram, errors: Counter):
+    """
+    Générateur async (iter_levels): une observation par parcours, arrêté ou non avant la fin.
+    Seul le temps passé dans le stockage compte, pas celui du code qui consomme les éléments
+    """
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        elapsed = 0.0
+        iterator = method(*args, **kwargs)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            await iterator.aclose()
+            histogram.observe(elapsed)
+    return wrapper
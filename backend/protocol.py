@@ -0,0 +1,183 @@
+"""
+Encodages du WebSocket /ws/game
+
+JSON (par défaut): un message texte JSON par frame, dans les deux sens.
+
+Binaire (opt-in: {"action": "init", "encoding": "binary"}): les messages fréquents
+passent en frames binaires de taille fixe (little-endian), les autres restent en JSON texte.
+
+Serveur -> client
+    0x01 timer_update   <B f                      time_left
+    0x02 update         <B B B f                  x, y, time_left
+    0x03 init           <B H B 4B f B B H H      level, grid_size, player x/y, goal x/y,
+                                                  time_left, total_icy, collected_icy,
+                                                  collected_gold, grid_rev
+                        + grid_size * grid_size octets int8 (grille ligne par ligne)
+Client -> serveur
+    0x81 move           <B B                      direction (0 up, 1 down, 2 left, 3 right)
+"""
+import asyncio
+import json
+import struct
+from typing import Dict, Optional
+
+from fastapi import WebSocket
+from starlette.websockets import WebSocketDisconnect
+
+from metrics import SEND_QUEUE
+
+OP_TIMER = 0x01
+OP_UPDATE = 0x02
+OP_INIT = 0x03
+OP_MOVE = 0x81
+
+DIRECTIONS = ("up", "down", "left", "right")
+
+TIMER = struct.Struct("<Bf")
+UPDATE = struct.Struct("<BBBf")
+INIT = struct.Struct("<BHB4BfBBHH")
+MOVE = struct.Struct("<BB")
+
+
+class JsonCodec:
+    """Encodage par défaut: tout part en JSON texte"""
+    name = "json"
+
+    def encode(self, message: Dict) -> Optional[bytes]:
+        return None
+
+    def decode(self, data: bytes) -> Dict:
+        return {}
+
+
+class BinaryCodec:
+    """Frames binaires pour timer_update, update et init; None = envoyer en JSON"""
+    name = "binary"
+
+    def encode(self, message: Dict) -> Optional[bytes]:
+        kind = message.get("type")
+
+        if kind == "timer_update":
+            return TIMER.pack(OP_TIMER, message["time_left"])
+
+        if kind == "update":
+            x, y = message["player_pos"]
+            return UPDATE.pack(OP_UPDATE, x, y, message["time_left"])
+
+        if kind == "init":
+            grid = message["grid"]
+            header = INIT.pack(
+                OP_INIT, message["level"], len(grid),
+                *message["player_pos"], *message["goal_pos"],
+                message["time_left"], message["total_icy"],
+                message["collected_icy"], message["collected_gold"],
+                message.get("grid_rev", 0)
+            )
+            return header + bytes(cell & 0xFF for row in grid for cell in row)
+
+        return None
+
+    def decode(self, data: bytes) -> Dict:
+        if len(data) == MOVE.size and data[0] == OP_MOVE and data[1] < len(DIRECTIONS):
+            return {"action": "move", "direction": DIRECTIONS[data[1]]}
+        return {}
+
+
+CODECS = {"json": JsonCodec, "binary": BinaryCodec}
+
+
+class GameConnection:
+    """
+    WebSocket + encodage négocié
+    Même interface que WebSocket (send_json / receive_json) pour le reste du serveur
+
+    Les envois passent par une file propre à la connexion, vidée par sa tâche d'écriture:
+    un socket lent ne retient que ses propres messages. Aucun envoi n'attend: file pleine =
+    client trop lent, la connexion est fermée (post() retourne False, send_json lève
+    WebSocketDisconnect et la boucle de réception se termine).
+    """
+
+    def __init__(self, websocket: WebSocket, max_pending: int = 128):
+        self.websocket = websocket
+        self.codec = JsonCodec()
+        self.closed = False
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._writer: Optional[asyncio.Task] = None
+
+    def negotiate(self, encoding: Optional[str]):
+        """Choisir l'encodage demandé par le client à l'init (JSON si inconnu)"""
+        self.codec = CODECS.get(encoding or "json", JsonCodec)()
+
+    # ===== CYCLE DE VIE =====
+    def start(self):
+        self._writer = asyncio.create_task(self._write())
+
+    async def close(self):
+        """Arrêter la tâche d'écriture et oublier les messages en attente"""
+        self.closed = True
+        if self._writer:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        SEND_QUEUE.dec(self._outbox.qsize())
+        while not self._outbox.empty():
+            self._outbox.get_nowait()
+
+    # ===== ENVOI =====
+    def post(self, message: Dict) -> bool:
+        """Déposer un message sans attendre; False si la connexion est fermée ou saturée"""
+        if self.closed:
+            return False
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self._abort()
+            return False
+        SEND_QUEUE.inc()
+        return True
+
+    async def send_json(self, message: Dict):
+        """Envoi depuis la boucle de réception du client: même file, WebSocketDisconnect si refusé"""
+        if not self.post(message):
+            raise WebSocketDisconnect(1008)
+
+    async def _write(self):
+        try:
+            while True:
+                message = await self._outbox.get()
+                try:
+                    frame = self.codec.encode(message)
+                    if frame is None:
+                        await self.websocket.send_json(message)
+                    else:
+                        await self.websocket.send_bytes(frame)
+                finally:
+                    SEND_QUEUE.dec()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Client parti: les messages suivants sont refusés
+            self.closed = True
+            asyncio.create_task(self._close_socket())
+
+    def _abort(self):
+        """Client qui ne lit plus: fermer la connexion, sa boucle de réception s'arrêtera"""
+        self.closed = True
+        if self._writer:
+            self._writer.cancel()
+        asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1008), timeout=5.0)
+        except Exception:
+            pass
+
+    async def receive_json(self) -> Dict:
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        if message.get("bytes") is not None:
+            return self.codec.decode(message["bytes"])
+        return json.loads(message["text"])
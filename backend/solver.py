@@ -0,0 +1,271 @@
+"""
+Solveur exact d'un niveau: nombre minimum de mouvements et faisabilité dans le temps imparti
+
+Pour gagner, le joueur doit ramasser tous les cristaux icy puis atteindre le goal.
+1. distances entre points d'intérêt (joueur, goal, cristaux icy, gold et rouges):
+   un BFS par point, tous menés en même temps sur une pile de grilles booléennes (K, H, W)
+   par décalages 4-voisins, comme LevelGenerator._flood_fill_batch. solve_many empile
+   ainsi les points de plusieurs grilles de même taille (generate_batch)
+2. ordre optimal de ramassage des icy par programmation dynamique sur les sous-ensembles
+   (bitmask), O(2^m * m^2) avec m <= 5 icy par niveau
+
+Règles reprises de GameSession.step:
+- le goal ne se traverse pas (NEED_CRYSTALS laisse le joueur en place): c'est un puits,
+  atteint par le BFS mais jamais étendu
+- passer sur un cristal icy ou gold le ramasse: l'ordre de visite des icy suffit
+- un cristal rouge coûte RED_PENALTY secondes. Le BFS s'arrête aussi sur les rouges; les
+  chemins qui en traversent sont ensuite composés de tronçons sans rouge (Floyd-Warshall
+  limité aux rouges comme étapes). Le temps minimum compte la pénalité à chaque traversée:
+  une borne haute (un rouge déjà ramassé est recompté), donc un niveau déclaré gagnable
+  l'est toujours
+
+Les matrices sont calculées une fois par LevelSolver et gardées en cache
+(celle en secondes, par valeur de moves_per_second).
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game_session import CRYSTAL_GOLD, CRYSTAL_ICY, CRYSTAL_RED, RED_PENALTY, WALLS
+
+# Rythme supposé du joueur (mouvements par seconde) pour convertir des mouvements en temps
+MOVES_PER_SECOND = 4.0
+
+# Au-delà, la table 2^m * m de la programmation dynamique devient trop grande
+MAX_ICY = 16
+
+# Index des deux premiers points d'intérêt
+PLAYER = 0
+GOAL = 1
+
+
+class LevelSolver:
+    """
+    Distances entre points d'intérêt d'une grille et meilleur ordre de ramassage
+    Points, dans l'ordre: joueur, goal, icy, gold, rouges (ligne par ligne, en (x, y))
+    """
+
+    def __init__(self, grid, player_pos: Tuple, goal_pos: Tuple):
+        self.grid = np.asarray(grid)
+        self.height, self.width = self.grid.shape
+
+        def cells(value: int) -> List[Tuple[int, int]]:
+            return [(int(x), int(y)) for y, x in np.argwhere(self.grid == value)]
+
+        self.icy = cells(CRYSTAL_ICY)
+        if len(self.icy) > MAX_ICY:
+            raise ValueError(f"Trop de cristaux icy pour le solveur: {len(self.icy)} (max {MAX_ICY})")
+        self.gold = cells(CRYSTAL_GOLD)
+        self.red = cells(CRYSTAL_RED)
+        self.points = [tuple(player_pos), tuple(goal_pos)] + self.icy + self.gold + self.red
+        self.icy_index = np.arange(2, 2 + len(self.icy))
+        self.red_index = np.arange(len(self.points) - len(self.red), len(self.points))
+
+        self._direct: Optional[np.ndarray] = None
+        self._moves: Optional[np.ndarray] = None
+        self._seconds: Dict[float, np.ndarray] = {}
+
+    # ===== DISTANCES =====
+    def distances(self) -> np.ndarray:
+        """Mouvements minimum entre points d'intérêt (K, K), inf si inatteignable"""
+        if self._moves is None:
+            self._moves = self._through_red(self._bfs())
+        return self._moves
+
+    def seconds(self, moves_per_second: float = MOVES_PER_SECOND) -> np.ndarray:
+        """Temps minimum entre points d'intérêt (K, K), pénalité des cristaux rouges comprise"""
+        matrix = self._seconds.get(moves_per_second)
+        if matrix is None:
+            matrix = self._bfs() / moves_per_second
+            # Entrer sur un rouge coûte la pénalité (pas pour celui d'où l'on part)
+            matrix[:, self.red_index] += RED_PENALTY
+            np.fill_diagonal(matrix, 0.0)
+            matrix = self._seconds[moves_per_second] = self._through_red(matrix)
+        return matrix
+
+    def _through_red(self, matrix: np.ndarray) -> np.ndarray:
+        """Autoriser les rouges comme étapes intermédiaires (Floyd-Warshall sur les rouges)"""
+        matrix = matrix.copy()
+        for r in self.red_index:
+            np.minimum(matrix, matrix[:, r, None] + matrix[None, r, :], out=matrix)
+        return matrix
+
+    def _bfs(self) -> np.ndarray:
+        """Mouvements entre points d'intérêt sans traverser de rouge ni le goal (K, K)"""
+        if self._direct is None:
+            _bfs_many([self])
+        return self._direct
+
+    # ===== RÉSOLUTION =====
+    def solve(self, moves_per_second: float = MOVES_PER_SECOND,
+              time_limit: Optional[float] = None) -> Dict:
+        """
+        min_moves: mouvements minimum pour gagner (None si impossible), order: icy dans l'ordre
+        de ce parcours. min_time: secondes au rythme moves_per_second, rouges comptés.
+        winnable: min_time < time_limit (None sans time_limit)
+        """
+        return solve_many([self], moves_per_second, time_limit)[0]
+
+
+def _bfs_many(solvers: List[LevelSolver]):
+    """
+    Remplir _direct de plusieurs solveurs (grilles de même taille) en un seul BFS
+    Un BFS par point et par grille, tous en même temps sur des grilles à plat bordées de
+    murs: un décalage de 1 ou de la largeur donne les voisins, sans test de limites.
+    Chaque ligne (grille, point de départ) ne cherche que les points de sa grille; les
+    grilles qui ont moins de points sont complétées par la case 0, un mur du bord.
+    """
+    if not solvers:
+        return
+    n = len(solvers)
+    h, w = solvers[0].height, solvers[0].width
+    stride = w + 2
+    size = (h + 2) * stride
+
+    counts = np.array([len(solver.points) for solver in solvers])
+    k = int(counts.max())
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    owner = np.repeat(np.arange(n), counts)
+    column = np.arange(offsets[-1]) - offsets[owner]
+    rows = np.arange(offsets[-1])
+
+    points = np.zeros((n, k), dtype=np.intp)
+    walkable = np.zeros((n, h + 2, stride), dtype=bool)
+    for i, solver in enumerate(solvers):
+        points[i, :counts[i]] = [(y + 1) * stride + x + 1 for x, y in solver.points]
+        walkable[i, 1:-1, 1:-1] = ~np.isin(solver.grid, WALLS)
+    walkable = walkable.reshape(n, size)
+
+    # Goal et rouges sont atteints mais ne propagent rien (sauf depuis eux-mêmes)
+    expand = walkable.copy()
+    for i, solver in enumerate(solvers):
+        expand[i, points[i, GOAL]] = False
+        expand[i, points[i, solver.red_index]] = False
+    expand = expand[owner]
+
+    targets = points[owner]
+    sources = targets[rows, column]
+    unvisited = walkable[owner]
+    unvisited[rows, sources] = False
+    frontier = np.zeros_like(unvisited)
+    frontier[rows, sources] = True
+    reached = np.zeros_like(unvisited)
+
+    dist = np.full((len(rows), k), np.inf)
+    dist[rows, column] = 0.0
+    missing = int(np.sum(counts * (counts - 1)))
+
+    # Cases des lignes 1..h de la grille bordée
+    lo, hi = stride, size - stride
+    inner = reached[:, lo:hi]
+    side = np.empty_like(inner)
+    step = 0
+    while missing:
+        step += 1
+        np.logical_or(frontier[:, lo - stride:hi - stride], frontier[:, lo + stride:hi + stride], out=inner)
+        np.logical_or(frontier[:, lo - 1:hi - 1], frontier[:, lo + 1:hi + 1], out=side)
+        inner |= side
+        reached &= unvisited
+        unvisited ^= reached
+
+        hits = np.take_along_axis(reached, targets, axis=1)
+        if hits.any():
+            dist[hits] = step
+            missing -= int(hits.sum())
+
+        reached &= expand
+        if not reached.any():
+            break
+        frontier, reached = reached, frontier
+        inner = reached[:, lo:hi]
+
+    for i, solver in enumerate(solvers):
+        solver._direct = dist[offsets[i]:offsets[i + 1], :counts[i]]
+
+
+# ===== ORDRE DE RAMASSAGE =====
+def _tours(solvers: List[LevelSolver], matrices: List[np.ndarray]) -> List[Tuple[float, List[int]]]:
+    """
+    Coût minimum joueur -> tous les icy -> goal, et l'ordre des icy (index dans solver.icy),
+    pour chaque solveur avec sa matrice. Les grilles qui ont le même nombre d'icy partagent
+    une seule programmation dynamique.
+    """
+    tours: List[Optional[Tuple[float, List[int]]]] = [None] * len(solvers)
+    groups: Dict[int, List[int]] = {}
+    for i, solver in enumerate(solvers):
+        groups.setdefault(len(solver.icy), []).append(i)
+
+    for m, members in groups.items():
+        if m == 0:
+            for i in members:
+                tours[i] = (float(matrices[i][PLAYER, GOAL]), [])
+            continue
+
+        icy = np.arange(2, 2 + m)
+        start = np.array([matrices[i][PLAYER, icy] for i in members])
+        legs_t = np.array([matrices[i][np.ix_(icy, icy)].T for i in members])
+        finish = np.array([matrices[i][icy, GOAL] for i in members])
+
+        # dp[g, mask, j]: coût minimum pour ramasser les icy de mask en finissant par j
+        full = 1 << m
+        bits = 1 << np.arange(m)
+        dp = np.full((len(members), full, m), np.inf)
+        parent = np.full((len(members), full, m), -1, dtype=np.int64)
+        dp[:, bits, np.arange(m)] = start
+
+        for mask in range(1, full):
+            if mask & (mask - 1) == 0:
+                continue  # un seul icy: départ direct depuis le joueur
+            inside = (mask & bits) != 0
+            # cand[g, j, i] = dp[g, mask sans j, i] + legs[g, i, j]
+            cand = dp[:, mask ^ bits] + legs_t
+            parent[:, mask] = cand.argmin(axis=2)
+            dp[:, mask] = np.where(inside, cand.min(axis=2), np.inf)
+
+        totals = dp[:, full - 1] + finish
+        for g, i in enumerate(members):
+            last = int(totals[g].argmin())
+            cost = float(totals[g, last])
+            if not np.isfinite(cost):
+                tours[i] = (cost, [])
+                continue
+            order = []
+            mask = full - 1
+            while last >= 0:
+                order.append(last)
+                mask, last = mask ^ int(bits[last]), int(parent[g, mask, last])
+            order.reverse()
+            tours[i] = (cost, order)
+    return tours
+
+
+# ===== RÉSOLUTION =====
+def solve_many(solvers: List[LevelSolver], moves_per_second: float = MOVES_PER_SECOND,
+               time_limit: Optional[float] = None) -> List[Dict]:
+    """LevelSolver.solve pour plusieurs grilles de même taille: BFS et ordres calculés ensemble"""
+    _bfs_many([solver for solver in solvers if solver._direct is None])
+    tours = _tours(solvers, [solver.distances() for solver in solvers])
+    possible = [bool(np.isfinite(moves)) for moves, _ in tours]
+    seconds = [moves / moves_per_second for moves, _ in tours]
+
+    # Le temps ne peut que s'allonger avec les rouges: inutile de le chercher si c'est déjà perdu
+    timed = [i for i, solver in enumerate(solvers)
+             if possible[i] and solver.red and (time_limit is None or seconds[i] < time_limit)]
+    timed_tours = _tours([solvers[i] for i in timed],
+                         [solvers[i].seconds(moves_per_second) for i in timed])
+    for i, (cost, _) in zip(timed, timed_tours):
+        seconds[i] = cost
+
+    return [{
+        "min_moves": int(moves) if ok else None,
+        "order": [list(solver.icy[i]) for i in order],
+        "min_time": round(time, 3) if ok else None,
+        "moves_per_second": moves_per_second,
+        "winnable": (ok and time < time_limit) if time_limit is not None else None
+    } for solver, (moves, order), ok, time in zip(solvers, tours, possible, seconds)]
+
+
+def solve_level(level: Dict, moves_per_second: float = MOVES_PER_SECOND) -> Dict:
+    """Résoudre un niveau au format de LevelGenerator (grid, player_pos, goal_pos, time_limit)"""
+    solver = LevelSolver(level["grid"], level["player_pos"], level["goal_pos"])
+    return solver.solve(moves_per_second, level.get("time_limit"))
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from storage import Storage, project_level
+from event_log import get_logger
+
+log = get_logger("storage")
+
+
+# Niveaux lus par requête quand on les parcourt (pagination par numéro)
+LEVEL_BATCH_SIZE = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    total_gold INTEGER NOT NULL DEFAULT 0,
+    levels_completed INTEGER NOT NULL DEFAULT 0,
+    current_level INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS levels (
+    level INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+class SQLiteDatabase(Storage):
+    """
+    Backend SQLite local (un fichier, aucun service)
+    Une seule connexion, utilisée depuis un thread dédié: les requêtes ne bloquent pas
+    la boucle asyncio et sont exécutées dans l'ordre. Les niveaux sont stockés en JSON.
+    """
+
+    def __init__(self, path: str = "pathmind.db"):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor.submit(self._connect).result()
+        log.info("storage_opened", "📦 Base de données SQLite", backend="sqlite", path=path)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    async def _run(self, fn, *args):
+        """Exécuter fn(connexion, *args) sur le thread SQLite"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, self._conn, *args)
+
+    # ===== UTILISATEURS =====
+    async def create_user(self, username: str, password: str) -> Dict:
+        password_hash = self._hash_password(password)
+
+        def insert(conn):
+            try:
+                with conn:
+                    cursor = conn.execute(
+                        "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
+                        (username, password_hash, datetime.utcnow().isoformat())
+                    )
+                return cursor.lastrowid
+            except sqlite3.IntegrityError:
+                return None
+
+        user_id = await self._run(insert)
+        if user_id is None:
+            return {"success": False, "message": "Ce nom d'utilisateur existe déjà"}
+
+        return {
+            "success": True,
+            "user": {
+                "id": str(user_id),
+                "username": username,
+                "total_gold": 0,
+                "levels_completed": 0,
+                "current_level": 1
+            }
+        }
+
+    async def verify_user(self, username: str, password: str) -> Dict:
+        user = await self._run(lambda conn: conn.execute(
+            "SELECT * FROM users WHERE username = ?", (username,)
+        ).fetchone())
+
+        if not user:
+            return {"success": False, "message": "Utilisateur non trouvé"}
+
+        if user["password_hash"] != self._hash_password(password):
+            return {"success": False, "message": "Mot de passe incorrect"}
+
+        return {
+            "success": True,
+            "user": {
+                "id": str(user["id"]),
+                "username": user["username"],
+                "total_gold": user["total_gold"],
+                "levels_completed": user["levels_completed"],
+                "current_level": user["current_level"]
+            }
+        }
+
+    async def update_user_gold(self, username: str, gold_collected: int) -> bool:
+        return await self.apply_user_increments({username: (gold_collected, 1)}) > 0
+
+    async def apply_user_increments(self, increments: Dict[str, tuple]) -> int:
+        if not increments:
+            return 0
+
+        rows = [(gold, completed, username) for username, (gold, completed) in increments.items()]
+
+        def update(conn):
+            with conn:
+                cursor = conn.executemany(
+                    "UPDATE users SET total_gold = total_gold + ?, "
+                    "levels_completed = levels_completed + ? WHERE username = ?",
+                    rows
+                )
+            return cursor.rowcount
+
+        return await self._run(update)
+
+    async def get_user_stats(self, username: str) -> Optional[Dict]:
+        user = await self._run(lambda conn: conn.execute(
+            "SELECT username, total_gold, levels_completed FROM users WHERE username = ?",
+            (username,)
+        ).fetchone())
+        return dict(user) if user else None
+
+    async def update_user_level(self, username: str, level: int) -> bool:
+        def update(conn):
+            with conn:
+                return conn.execute(
+                    "UPDATE users SET current_level = ? WHERE username = ?", (level, username)
+                ).rowcount
+
+        return await self._run(update) > 0
+
+    # ===== LEADERBOARD =====
+    async def get_leaderboard(self, limit: int = 50) -> List[Dict]:
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT username, total_gold, levels_completed FROM users "
+            "ORDER BY total_gold DESC LIMIT ?", (limit,)
+        ).fetchall())
+        return [dict(row) for row in rows]
+
+    # ===== NIVEAUX =====
+    async def save_level(self, level_data: Dict) -> bool:
+        return await self.save_levels([level_data]) == 1
+
+    async def save_levels(self, levels: List[Dict]) -> int:
+        if not levels:
+            return 0
+
+        def upsert(conn):
+            with conn:
+                for level_data in levels:
+                    level_num = level_data.get("level", 1)
+                    # Même sémantique que $set: fusion avec le niveau existant
+                    row = conn.execute("SELECT data FROM levels WHERE level = ?", (level_num,)).fetchone()
+                    level = json.loads(row["data"]) if row else {}
+                    level.update(level_data)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO levels (level, data) VALUES (?, ?)",
+                        (level_num, json.dumps(level))
+                    )
+            return len(levels)
+
+        return await self._run(upsert)
+
+    async def get_level(self, level_num: int) -> Optional[Dict]:
+        row = await self._run(lambda conn: conn.execute(
+            "SELECT data FROM levels WHERE level = ?", (level_num,)
+        ).fetchone())
+        return json.loads(row["data"]) if row else None
+
+    async def get_all_levels(self) -> List[Dict]:
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT data FROM levels ORDER BY level"
+        ).fetchall())
+        return [json.loads(row["data"]) for row in rows]
+
+    async def iter_levels(self, after: Optional[int] = None, limit: Optional[int] = None,
+                          fields: Optional[Iterable[str]] = None) -> AsyncIterator[Dict]:
+        """Parcourir les niveaux par pages de LEVEL_BATCH_SIZE (une page en mémoire à la fois)"""
+        fields = None if fields is None else set(fields)
+        last = -1 if after is None else after
+        remaining = limit or None
+
+        while remaining is None or remaining > 0:
+            batch = LEVEL_BATCH_SIZE if remaining is None else min(LEVEL_BATCH_SIZE, remaining)
+            rows = await self._run(lambda conn: conn.execute(
+                "SELECT level, data FROM levels WHERE level > ? ORDER BY level LIMIT ?",
+                (last, batch)
+            ).fetchall())
+
+            for row in rows:
+                yield project_level(json.loads(row["data"]), fields)
+
+            if len(rows) < batch:
+                return
+            last = rows[-1]["level"]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    async def delete_all_levels(self) -> int:
+        def delete(conn):
+            with conn:
+                return conn.execute("DELETE FROM levels").rowcount
+
+        return await self._run(delete)
+
+    # ===== UTILITAIRES =====
+    async def init_indexes(self):
+        await self._run(lambda conn: conn.execute(
+            "CREATE INDEX IF NOT EXISTS users_total_gold ON users (total_gold)"
+        ))
+        log.info("storage_indexes", "✅ Index SQLite créés", backend="sqlite")
+
+    async def close(self):
+        await self._run(lambda conn: conn.close())
+        self._executor.shutdown(wait=True)
+        log.info("storage_closed", "👋 Connexion SQLite fermée", backend="sqlite")
@@ -0,0 +1,121 @@
+"""
+Interface de stockage du serveur (utilisateurs, classement, niveaux)
+
+Backends (variable d'environnement DATABASE_BACKEND):
+    mongo   Database (Motor / MongoDB), par défaut
+    memory  MemoryDatabase, tout en mémoire (tests, benchmarks, CI sans service)
+    sqlite  SQLiteDatabase, fichier local (SQLITE_PATH)
+"""
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+# Champs d'un niveau qu'on peut demander à iter_levels (fields): les autres clés d'un document
+# (_id MongoDB, grid_shape / grid_encoding de la grille compressée) ne sortent jamais seules
+LEVEL_FIELDS = frozenset({
+    "level", "difficulty", "grid", "grid_size", "player_pos", "goal_pos", "time_limit",
+    "total_icy", "crystals_icy", "crystals_gold", "crystals_red", "min_moves", "min_time"
+})
+
+
+class Storage(ABC):
+    """Opérations de stockage utilisées par le serveur, identiques pour tous les backends"""
+
+    # ===== UTILISATEURS =====
+    @abstractmethod
+    async def create_user(self, username: str, password: str) -> Dict:
+        """Créer un utilisateur: {"success", "user"} ou {"success": False, "message"}"""
+
+    @abstractmethod
+    async def verify_user(self, username: str, password: str) -> Dict:
+        """Vérifier les identifiants: même format que create_user"""
+
+    @abstractmethod
+    async def update_user_gold(self, username: str, gold_collected: int) -> bool:
+        """Ajouter du gold et un niveau terminé à un utilisateur"""
+
+    @abstractmethod
+    async def apply_user_increments(self, increments: Dict[str, tuple]) -> int:
+        """Appliquer en lot username -> (gold, niveaux terminés)"""
+
+    @abstractmethod
+    async def get_user_stats(self, username: str) -> Optional[Dict]:
+        """Gold et niveaux terminés d'un joueur (None s'il n'existe pas)"""
+
+    @abstractmethod
+    async def update_user_level(self, username: str, level: int) -> bool:
+        """Mettre à jour le niveau actuel d'un utilisateur"""
+
+    # ===== LEADERBOARD =====
+    @abstractmethod
+    async def get_leaderboard(self, limit: int = 50) -> List[Dict]:
+        """Joueurs triés par gold décroissant"""
+
+    # ===== NIVEAUX =====
+    @abstractmethod
+    async def save_level(self, level_data: Dict) -> bool:
+        """Sauvegarder un niveau (upsert sur son numéro)"""
+
+    @abstractmethod
+    async def save_levels(self, levels: List[Dict]) -> int:
+        """Sauvegarder un lot de niveaux, retourne le nombre écrit"""
+
+    @abstractmethod
+    async def get_level(self, level_num: int) -> Optional[Dict]:
+        """Récupérer un niveau par son numéro"""
+
+    @abstractmethod
+    async def get_all_levels(self) -> List[Dict]:
+        """Tous les niveaux triés par numéro"""
+
+    @abstractmethod
+    def iter_levels(self, after: Optional[int] = None, limit: Optional[int] = None,
+                    fields: Optional[Iterable[str]] = None) -> AsyncIterator[Dict]:
+        """
+        Parcourir les niveaux par numéro croissant, sans les charger tous en mémoire
+        after: curseur (numéro du dernier niveau déjà lu), fields: champs à retourner
+        parmi LEVEL_FIELDS, les autres sont ignorés (le numéro "level" est toujours inclus)
+        """
+
+    @abstractmethod
+    async def delete_all_levels(self) -> int:
+        """Supprimer tous les niveaux, retourne le nombre supprimé"""
+
+    # ===== UTILITAIRES =====
+    async def init_indexes(self):
+        """Créer les index (rien à faire par défaut)"""
+
+    async def close(self):
+        """Fermer la connexion (rien à faire par défaut)"""
+
+    def _hash_password(self, password: str) -> str:
+        """Hash simple du mot de passe avec SHA-256"""
+        return hashlib.sha256(password.encode()).hexdigest()
+
+
+def project_level(level: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """Ne garder que les champs demandés d'un niveau (tous si fields est None)"""
+    if fields is None:
+        return level
+    return {key: value for key, value in level.items()
+            if key == "level" or (key in fields and key in LEVEL_FIELDS)}
+
+
+def create_database(backend: Optional[str] = None) -> Storage:
+    """Instancier le backend choisi (DATABASE_BACKEND), importé seulement s'il est utilisé"""
+    backend = (backend or os.getenv("DATABASE_BACKEND", "mongo")).lower()
+
+    if backend == "memory":
+        from memory_database import MemoryDatabase
+        return MemoryDatabase()
+
+    if backend == "sqlite":
+        from sqlite_database import SQLiteDatabase
+        return SQLiteDatabase(os.getenv("SQLITE_PATH", "pathmind.db"))
+
+    if backend in ("mongo", "mongodb"):
+        from database import Database
+        return Database()
+
+    raise ValueError(f"DATABASE_BACKEND inconnu: {backend} (mongo, memory ou sqlite)")
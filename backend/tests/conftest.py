@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules du backend s'importent à plat (comme depuis backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
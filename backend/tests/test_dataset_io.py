@@ -0,0 +1,40 @@
+import pytest
+
+from dataset_io import BinaryDataset, iter_ndjson
+from level_generator import LevelGenerator
+
+
+def test_binary_dataset_round_trip(tmp_path):
+    """Chaque niveau binaire décodé est identique à son enregistrement NDJSON"""
+    generator = LevelGenerator(seed=7)
+    generator.generate_dataset_ndjson(60, str(tmp_path / "dataset.ndjson"), seed=7, shard_size=20)
+    generator.generate_dataset_binary(60, str(tmp_path / "dataset_bin"), seed=7, shard_size=20)
+
+    records = list(iter_ndjson(str(tmp_path / "dataset.ndjson")))
+    dataset = BinaryDataset(str(tmp_path / "dataset_bin"))
+
+    assert len(dataset) == len(records) == 60
+    assert all("min_moves" in record for record in records)
+    for record, decoded in zip(records, dataset):
+        assert decoded == record
+
+
+def test_binary_dataset_without_solution(tmp_path):
+    """Niveaux générés sans solveur: min_moves et min_time restent absents / None"""
+    generator = LevelGenerator(seed=7, moves_per_second=None)
+    generator.generate_dataset_ndjson(20, str(tmp_path / "dataset.ndjson"), seed=7)
+    generator.generate_dataset_binary(20, str(tmp_path / "dataset_bin"), seed=7)
+
+    records = list(iter_ndjson(str(tmp_path / "dataset.ndjson")))
+    assert all("min_moves" not in record and record["features"]["min_moves"] is None
+               for record in records)
+    assert list(BinaryDataset(str(tmp_path / "dataset_bin"))) == records
+
+
+def test_resume_rejects_other_moves_per_second(tmp_path):
+    """Un dataset résolu ne reprend pas sans solveur (et inversement)"""
+    output = str(tmp_path / "dataset.ndjson")
+    LevelGenerator(seed=7).generate_dataset_ndjson(10, output, seed=7)
+
+    with pytest.raises(ValueError, match="moves_per_second"):
+        LevelGenerator(seed=7, moves_per_second=None).generate_dataset_ndjson(20, output, seed=7)
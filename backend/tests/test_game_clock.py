@@ -0,0 +1,55 @@
+import asyncio
+
+from game_clock import GameClock
+from game_session import GameSession
+from protocol import GameConnection
+
+
+class StuckWebSocket:
+    """Client qui ne lit plus: chaque envoi reste bloqué"""
+
+    def __init__(self):
+        self.closed_with = None
+
+    async def send_json(self, message):
+        await asyncio.Event().wait()
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def test_slow_client_does_not_delay_other_sessions():
+    async def run():
+        clock = GameClock(tick_rate=50)
+        stuck, fast = StuckWebSocket(), RecordingWebSocket()
+        connections = [GameConnection(stuck, max_pending=5), GameConnection(fast)]
+        sessions = [GameSession(username="stuck"), GameSession(username="fast")]
+        for session, connection in zip(sessions, connections):
+            connection.start()
+            clock.register(session, connection.post)
+            clock.start_timer(session, 0.3)
+
+        await clock.start()
+        await asyncio.sleep(0.5)
+        await clock.stop()
+        for connection in connections:
+            await connection.close()
+        return clock, stuck, fast, sessions
+
+    clock, stuck, fast, sessions = asyncio.run(run())
+
+    # Le client bloqué a rempli sa file: déconnecté et plus suivi par l'horloge
+    assert stuck.closed_with == 1008
+    assert len(clock) == 1
+    # L'autre reçoit ses ticks et son game over à l'heure
+    assert sum(m["type"] == "timer_update" for m in fast.sent) >= 10
+    assert fast.sent[-1]["type"] == "game_over"
+    assert sessions[1].game_over
@@ -0,0 +1,84 @@
+from game_session import (
+    BLOCKED, CRYSTAL_GOLD, CRYSTAL_ICY, CRYSTAL_RED, GOLD, ICY, MOVED, NEED_CRYSTALS, RED,
+    RED_GAME_OVER, RED_PENALTY, VICTORY, GameSession
+)
+
+# Ligne y=0: joueur (0, 0), mur en (1, 0); ligne y=1: icy, gold, rouge, goal
+GRID = [
+    [0, 1, 0, 0],
+    [CRYSTAL_ICY, CRYSTAL_GOLD, CRYSTAL_RED, 0],
+]
+
+
+def new_session(time_limit: float = 30.0) -> GameSession:
+    session = GameSession(username="test")
+    session.load({
+        "grid": [row[:] for row in GRID],
+        "player_pos": [0, 0],
+        "goal_pos": [3, 1],
+        "time_limit": time_limit,
+        "total_icy": 1
+    }, 1)
+    return session
+
+
+def test_wall_and_border_block():
+    session = new_session()
+    assert session.step(1, 0) == BLOCKED
+    assert session.step(-1, 0) == BLOCKED
+    assert session.step(0, -1) == BLOCKED
+    assert session.player_pos == [0, 0]
+    assert session.grid_rev == 0
+
+
+def test_goal_needs_all_icy_crystals():
+    session = new_session()
+    session.player_x, session.player_y = 3, 0
+    assert session.step(0, 1) == NEED_CRYSTALS
+    assert session.player_pos == [3, 0]
+    assert session.active
+
+
+def test_collect_then_win():
+    session = new_session()
+    assert session.step(0, 1) == ICY
+    assert session.last_change_cell() == [0, 1, 0]
+    assert session.step(1, 0) == GOLD
+    assert session.step(1, 0) == RED
+    assert session.step(1, 0) == VICTORY
+    assert (session.collected_icy, session.collected_gold) == (1, 1)
+    assert session.player_pos == [3, 1]
+    assert session.victory and not session.active
+    assert session.grid_rev == 3
+
+
+def test_red_penalty_on_stopped_timer_and_deadline():
+    session = new_session(time_limit=10.0)
+    session.player_x, session.player_y = 1, 1
+    assert session.step(1, 0) == RED
+    assert session.time_left == 10.0 - RED_PENALTY
+
+    # Timer en cours: la pénalité avance la deadline
+    session = new_session()
+    session.player_x, session.player_y = 1, 1
+    session.deadline = 100.0
+    assert session.step(1, 0, now=50.0) == RED
+    assert session.deadline == 100.0 - RED_PENALTY
+    assert session.remaining(50.0) == 50.0 - RED_PENALTY
+
+
+def test_red_penalty_can_end_the_game():
+    session = new_session()
+    session.player_x, session.player_y = 1, 1
+    session.deadline = 52.0
+    assert session.step(1, 0, now=50.0) == RED_GAME_OVER
+    assert session.game_over and not session.active
+    assert session.time_left == 0 and session.deadline is None
+
+
+def test_moving_on_cleared_cell():
+    session = new_session()
+    session.step(0, 1)
+    session.step(0, -1)
+    assert session.step(0, 1) == MOVED
+    assert session.collected_icy == 1
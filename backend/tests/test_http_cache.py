@@ -0,0 +1,58 @@
+import asyncio
+
+from http_cache import CachedResponse, HTTPCacheMiddleware, ResponseCache
+
+
+def entry(body: bytes) -> CachedResponse:
+    return CachedResponse(None, body, "application/json")
+
+
+def test_key_keeps_only_route_params_sorted():
+    cache = ResponseCache()
+    cache.route("/api/levels", params=("after", "limit"))
+    cache.route("/")
+
+    assert cache.key("/api/levels", b"limit=5&after=2") == cache.key("/api/levels", b"after=2&limit=5")
+    assert cache.key("/api/levels", b"after=2&cb=123") == cache.key("/api/levels", b"after=2")
+    assert cache.key("/", b"cb=123") == ("/", "")
+
+
+def test_total_bytes_bounded():
+    cache = ResponseCache(max_bytes=1000, max_body=600)
+    for i in range(5):
+        cache.put(("/", str(i)), entry(b"x" * 300), cache.generation)
+    assert len(cache) == 3
+
+    cache.put(("/", "big"), entry(b"x" * 700), cache.generation)
+    assert cache.get(("/", "big"), None) is None
+
+
+def test_store_after_invalidate_is_dropped():
+    """Une réponse calculée pendant invalidate() n'est pas mémorisée"""
+    cache = ResponseCache()
+    cache.route("/api/levels")
+    body = {"value": b"old"}
+
+    async def app(scope, receive, send):
+        response = body["value"]
+        # Écriture concurrente pendant le calcul de la réponse
+        body["value"] = b"new"
+        cache.invalidate("/api/levels")
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": response})
+
+    async def request():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/api/levels",
+                 "query_string": b"", "headers": []}
+        await HTTPCacheMiddleware(app, cache)(scope, None, send)
+        return sent[-1]["body"]
+
+    assert asyncio.run(request()) == b"old"
+    assert len(cache) == 0
+    assert asyncio.run(request()) == b"new"
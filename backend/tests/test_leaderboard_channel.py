@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from leaderboard_channel import LeaderboardChannel
+
+
+class FakeLeaderboard:
+    def __init__(self):
+        self.version = 0
+        self.on_change = None
+        self.entries = []
+
+    def top(self):
+        return list(self.entries)
+
+    def win(self, username):
+        self.entries.append({"username": username})
+        self.version += 1
+        self.on_change()
+
+
+class StuckWebSocket:
+    async def send_text(self, payload):
+        await asyncio.Event().wait()
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, payload):
+        self.sent.append(json.loads(payload))
+
+
+def test_stuck_subscriber_does_not_block_broadcast():
+    async def run():
+        leaderboard = FakeLeaderboard()
+        channel = LeaderboardChannel(leaderboard, max_rate=100)
+        await channel.start()
+        fast = RecordingWebSocket()
+        await channel.subscribe(StuckWebSocket())
+        await channel.subscribe(fast)
+        await asyncio.sleep(0.01)
+
+        for name in ("a", "b", "c"):
+            leaderboard.win(name)
+            await asyncio.sleep(0.05)
+        await channel.stop()
+        return fast
+
+    fast = asyncio.run(run())
+    assert [len(message["leaderboard"]) for message in fast.sent] == [0, 1, 2, 3]
@@ -0,0 +1,36 @@
+import asyncio
+
+from level_cache import LevelCache
+
+
+def level(time_limit: int) -> dict:
+    return {"level": 1, "grid": [[0]], "time_limit": time_limit}
+
+
+def test_invalidate_during_load_is_not_cached():
+    async def run():
+        cache = LevelCache()
+        stored = {"value": level(30)}
+        release = asyncio.Event()
+
+        async def slow_loader(level_num):
+            loaded = stored["value"]
+            await release.wait()
+            return loaded
+
+        first = asyncio.create_task(cache.get(1, slow_loader))
+        await asyncio.sleep(0.01)
+        # Le niveau change en base pendant le chargement
+        stored["value"] = level(20)
+        cache.invalidate(1)
+        second = asyncio.create_task(cache.get(1, slow_loader))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        return await first, await second, await cache.get(1, slow_loader)
+
+    first, second, third = asyncio.run(run())
+    assert first["time_limit"] == 30
+    # Après invalidate: nouveau chargement, jamais l'ancien résultat
+    assert second["time_limit"] == 20
+    assert third["time_limit"] == 20
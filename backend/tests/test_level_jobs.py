@@ -0,0 +1,34 @@
+import asyncio
+
+from level_jobs import LevelJobManager
+from level_pool import LevelPool
+from memory_database import MemoryDatabase
+
+
+def run_job(count: int, save: bool):
+    async def run():
+        db = MemoryDatabase()
+        pool = LevelPool(difficulties=[], use_processes=False)
+        await pool.start()
+        jobs = LevelJobManager(db, pool)
+        job = jobs.submit(count, save)
+        await asyncio.gather(*jobs._tasks)
+        await pool.stop()
+        return job.to_dict(), await db.get_all_levels()
+
+    return asyncio.run(run())
+
+
+def test_unsaved_job_returns_its_levels():
+    status, stored = run_job(3, save=False)
+    assert status["status"] == "done"
+    assert [level["level"] for level in status["levels"]] == [1, 2, 3]
+    assert stored == []
+
+
+def test_saved_job_stores_levels(tmp_path, monkeypatch):
+    # Le job écrit aussi levels.json dans le dossier courant
+    monkeypatch.chdir(tmp_path)
+    status, stored = run_job(3, save=True)
+    assert status["status"] == "done" and "levels" not in status
+    assert [level["level"] for level in stored] == [1, 2, 3]
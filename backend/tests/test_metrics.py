@@ -0,0 +1,22 @@
+import asyncio
+
+import metrics
+from memory_database import MemoryDatabase
+
+
+def test_instrument_storage_times_async_iterators():
+    db = metrics.instrument_storage(MemoryDatabase())
+    histogram = metrics.DB_SECONDS.labels(operation="iter_levels")
+    before = sum(histogram.counts)
+
+    async def run():
+        await db.save_levels([{"level": n, "difficulty": 1} for n in range(1, 6)])
+        full = [level async for level in db.iter_levels()]
+        # Parcours abandonné avant la fin: compté aussi
+        async for _ in db.iter_levels():
+            break
+        return full
+
+    levels = asyncio.run(run())
+    assert [level["level"] for level in levels] == [1, 2, 3, 4, 5]
+    assert sum(histogram.counts) == before + 2
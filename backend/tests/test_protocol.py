@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from protocol import GameConnection
+
+
+class NeverReadingWebSocket:
+    """Client qui ne lit plus: le premier envoi reste bloqué"""
+
+    def __init__(self):
+        self.closed_with = None
+
+    async def send_json(self, message):
+        await asyncio.Event().wait()
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+class BrokenWebSocket(NeverReadingWebSocket):
+    async def send_json(self, message):
+        raise RuntimeError("socket fermé")
+
+
+def test_send_json_fails_fast_when_client_never_reads():
+    async def run():
+        websocket = NeverReadingWebSocket()
+        connection = GameConnection(websocket, max_pending=3)
+        connection.start()
+        with pytest.raises(WebSocketDisconnect):
+            # Ne doit jamais attendre une place dans la file
+            await asyncio.wait_for(_send_many(connection, 10), timeout=1.0)
+        await asyncio.sleep(0)
+        await connection.close()
+        return websocket
+
+    assert asyncio.run(run()).closed_with == 1008
+
+
+def test_send_json_fails_after_socket_error():
+    async def run():
+        websocket = BrokenWebSocket()
+        connection = GameConnection(websocket)
+        connection.start()
+        await connection.send_json({"type": "update"})
+        await asyncio.sleep(0.01)
+        with pytest.raises(WebSocketDisconnect):
+            await connection.send_json({"type": "update"})
+        await connection.close()
+        return websocket
+
+    assert asyncio.run(run()).closed_with == 1008
+
+
+async def _send_many(connection: GameConnection, count: int):
+    for _ in range(count):
+        await connection.send_json({"type": "update"})
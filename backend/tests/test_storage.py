@@ -0,0 +1,73 @@
+"""Contrat commun des backends de stockage (mémoire et SQLite; MongoDB demande un serveur)"""
+import asyncio
+
+import pytest
+
+from memory_database import MemoryDatabase
+from sqlite_database import SQLiteDatabase
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def db(request, tmp_path):
+    storage = MemoryDatabase() if request.param == "memory" else SQLiteDatabase(str(tmp_path / "test.db"))
+    yield storage
+    asyncio.run(storage.close())
+
+
+def level(num: int, **extra) -> dict:
+    data = {
+        "level": num,
+        "difficulty": 1 + num % 10,
+        "grid": [[0, 1], [5, 0]],
+        "player_pos": [0, 0],
+        "goal_pos": [1, 1],
+        "time_limit": 30,
+        "total_icy": 1
+    }
+    data.update(extra)
+    return data
+
+
+def test_levels_save_get_and_iterate(db):
+    async def run():
+        assert await db.save_levels([level(n) for n in range(1, 8)]) == 7
+        assert await db.save_level(level(3, time_limit=20))
+
+        assert await db.get_level(3) == level(3, time_limit=20)
+        assert await db.get_level(99) is None
+        assert [lv["level"] for lv in await db.get_all_levels()] == list(range(1, 8))
+
+        page = [lv async for lv in db.iter_levels(after=2, limit=3)]
+        projected = [lv async for lv in db.iter_levels(after=5, fields=["difficulty", "_id"])]
+        deleted = await db.delete_all_levels()
+        return page, projected, deleted, await db.get_all_levels()
+
+    page, projected, deleted, remaining = asyncio.run(run())
+    assert [lv["level"] for lv in page] == [3, 4, 5]
+    assert page[0] == level(3, time_limit=20)
+    assert projected == [{"level": 6, "difficulty": 7}, {"level": 7, "difficulty": 8}]
+    assert deleted == 7 and remaining == []
+
+
+def test_users_and_leaderboard(db):
+    async def run():
+        assert (await db.create_user("alice", "secret"))["success"]
+        assert (await db.create_user("bob", "hunter2"))["success"]
+        assert not (await db.create_user("alice", "other"))["success"]
+
+        assert (await db.verify_user("alice", "secret"))["user"]["username"] == "alice"
+        assert not (await db.verify_user("alice", "wrong"))["success"]
+        assert not (await db.verify_user("carol", "secret"))["success"]
+
+        assert await db.update_user_gold("alice", 3)
+        assert await db.apply_user_increments({"bob": (5, 2), "carol": (1, 1)}) == 1
+        assert await db.update_user_level("bob", 4)
+        return await db.get_leaderboard(), await db.get_user_stats("alice"), await db.get_user_stats("carol")
+
+    leaderboard, alice, carol = asyncio.run(run())
+    assert leaderboard == [
+        {"username": "bob", "total_gold": 5, "levels_completed": 2},
+        {"username": "alice", "total_gold": 3, "levels_completed": 1}
+    ]
+    assert alice == {"username": "alice", "total_gold": 3, "levels_completed": 1}
+    assert carol is None
@@ -1,18 +1,101 @@
 from fastapi import FastAPI, WebSocket, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
 import json
-import asyncio
+import logging
 import time
 import os
 from typing import Optional
-from level_generator import LevelGenerator
-from database import Database
+from storage import LEVEL_FIELDS, Storage, create_database
+from level_cache import LevelCache
+from http_cache import ResponseCache, HTTPCacheMiddleware
+import metrics
+from event_log import get_logger, setup_logging
+from level_pool import LevelPool
+from level_jobs import LevelJobManager
+from game_clock import GameClock
+from leaderboard import Leaderboard
+from leaderboard_channel import LeaderboardChannel
+from protocol import GameConnection
+from game_session import (
+    GameSession, BLOCKED, MOVED, GOLD, ICY, RED, RED_GAME_OVER, NEED_CRYSTALS, VICTORY
+)
 
 # Initialisation
+setup_logging()  # LOG_LEVEL, LOG_SAMPLING, LOG_FORMAT
+log = get_logger("game")
 app = FastAPI(title="PathMind Game Server")
-db = Database()
-level_generator = LevelGenerator(grid_size=15)
+db = metrics.instrument_storage(create_database())  # DATABASE_BACKEND: mongo (défaut), memory ou sqlite
+
+# Cache des niveaux (évite un aller-retour MongoDB à chaque init/restart/next_level)
+level_cache = LevelCache(
+    maxsize=int(os.getenv("LEVEL_CACHE_SIZE", 64)),
+    ttl=float(os.getenv("LEVEL_CACHE_TTL", 300))
+)
+
+# Réserve de niveaux pré-générés (la génération ne tourne jamais sur la boucle asyncio)
+level_pool = LevelPool(
+    grid_size=15,
+    size=int(os.getenv("LEVEL_POOL_SIZE", 2)),
+    workers=int(os.getenv("LEVEL_POOL_WORKERS", 1)),
+    use_processes=os.getenv("LEVEL_POOL_EXECUTOR", "process") == "process",
+    # Rythme du joueur supposé pour vérifier qu'un niveau se gagne à temps (0 = pas de vérification)
+    moves_per_second=float(os.getenv("LEVEL_MOVES_PER_SECOND", 4)) or None
+)
+
+# Horloge unique des timers de partie (fréquence des timer_update en Hz)
+game_clock = GameClock(tick_rate=float(os.getenv("TIMER_UPDATE_RATE", 10)))
+
+# Générations de niveaux en tâche de fond (/api/levels/generate)
+level_jobs = LevelJobManager(
+    db, level_pool,
+    on_saved=lambda levels: levels_changed(),
+    max_count=int(os.getenv("LEVEL_JOB_MAX_COUNT", 1000))
+)
+
+# Classement en mémoire, victoires écrites en lot (write-behind)
+leaderboard = Leaderboard(
+    db,
+    size=int(os.getenv("LEADERBOARD_SIZE", 50)),
+    flush_interval=float(os.getenv("LEADERBOARD_FLUSH_INTERVAL", 2))
+)
+
+# Abonnés au classement en direct (/ws/leaderboard), envois regroupés (Hz max)
+leaderboard_channel = LeaderboardChannel(
+    leaderboard,
+    max_rate=float(os.getenv("LEADERBOARD_BROADCAST_RATE", 2))
+)
+
+# Cache HTTP des routes de lecture (ETag/304, gzip/brotli)
+response_cache = ResponseCache(
+    max_bytes=int(float(os.getenv("RESPONSE_CACHE_MB", 32)) * 1024 * 1024),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", 60))
+)
+response_cache.route("/")
+response_cache.route("/api/leaderboard", version=lambda: leaderboard.version)
+response_cache.route("/api/levels", params=("after", "limit", "fields", "stream"))
+
+
+def levels_changed(level_num: Optional[int] = None):
+    """Niveaux modifiés en base: vider les caches qui en dépendent"""
+    level_cache.invalidate(level_num)
+    response_cache.invalidate("/api/levels")
+
+
+# Ajouté avant CORS pour que les en-têtes CORS s'appliquent aussi aux réponses en cache
+app.add_middleware(HTTPCacheMiddleware, cache=response_cache)
+
+# Métriques lues au moment du scrape (/metrics)
+metrics.ACTIVE_SESSIONS.set_function(lambda: len(game_clock))
+metrics.LEVEL_POOL_READY.set_function(lambda: level_pool.ready())
+metrics.LEADERBOARD_SUBSCRIBERS.set_function(lambda: len(leaderboard_channel))
+metrics.LEVEL_CACHE.labels(result="hit").set_function(lambda: level_cache.hits)
+metrics.LEVEL_CACHE.labels(result="miss").set_function(lambda: level_cache.misses)
+metrics.RESPONSE_CACHE.labels(result="hit").set_function(lambda: response_cache.hits)
+metrics.RESPONSE_CACHE.labels(result="miss").set_function(lambda: response_cache.misses)
+MOVE_SECONDS = metrics.MOVE_SECONDS.labels(action="move")
+MOVES_SECONDS = metrics.MOVE_SECONDS.labels(action="moves")
 
 # CORS - Configuration pour développement et production
 # CORS - Configuration sécurisée
@@ -35,6 +118,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ===== CYCLE DE VIE =====
+@app.on_event("startup")
+async def startup():
+    await level_pool.start()
+    await game_clock.start()
+    await leaderboard.start()
+    await leaderboard_channel.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await game_clock.stop()
+    await leaderboard_channel.stop()
+    await leaderboard.stop()
+    await level_pool.stop()
+
 # ===== MODÈLES =====
 class UserCredentials(BaseModel):
     username: str
@@ -45,11 +143,17 @@ class UserCredentials(BaseModel):
 async def root():
     return {"message": "PathMind Game Server is running", "version": "1.0"}
 
+@app.get("/metrics")
+async def get_metrics():
+    """Métriques au format texte Prometheus"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/api/register")
 async def register(credentials: UserCredentials):
     """Inscription d'un nouvel utilisateur"""
     result = await db.create_user(credentials.username, credentials.password)
     if result["success"]:
+        leaderboard.add_user(credentials.username)
         return {"user": result["user"]}
     raise HTTPException(status_code=400, detail=result["message"])
 
@@ -58,294 +162,404 @@ async def login(credentials: UserCredentials):
     """Connexion d'un utilisateur"""
     result = await db.verify_user(credentials.username, credentials.password)
     if result["success"]:
-        return {"user": result["user"]}
+        # Gold des victoires pas encore écrites en base
+        return {"user": leaderboard.overlay(result["user"])}
     raise HTTPException(status_code=401, detail=result["message"])
 
 @app.get("/api/leaderboard")
 async def get_leaderboard():
     """Récupérer le classement global"""
-    leaderboard = await db.get_leaderboard(limit=50)
-    return {"leaderboard": leaderboard}
+    return {"leaderboard": leaderboard.top()}
+
+# Taille des pages JSON de /api/levels (par défaut / maximum)
+LEVELS_PAGE_SIZE = 100
+LEVELS_MAX_PAGE_SIZE = 1000
+
+# Octets accumulés avant chaque envoi du flux NDJSON
+LEVELS_STREAM_CHUNK = 64 * 1024
+
 
 @app.get("/api/levels")
-async def get_levels():
-    """Récupérer tous les niveaux"""
-    levels = await db.get_all_levels()
-    return {"levels": levels, "count": len(levels)}
+async def get_levels(after: Optional[int] = None, limit: Optional[int] = None,
+                     fields: Optional[str] = None, stream: bool = False):
+    """
+    Récupérer les niveaux par numéro croissant
+    - after: curseur, numéro du dernier niveau reçu (next_after de la page précédente)
+    - fields: champs à retourner, séparés par des virgules (ex: level,difficulty,time_limit
+      pour les métadonnées sans la grille)
+    - stream: réponse NDJSON (un niveau par ligne) lue directement depuis le curseur,
+      sans limite par défaut
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit doit être positif")
+    
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    unknown = sorted(set(selected or ()) - LEVEL_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus: {', '.join(unknown)}")
+    
+    if stream:
+        return StreamingResponse(
+            stream_levels(after, limit, selected),
+            media_type="application/x-ndjson"
+        )
+    
+    limit = min(limit or LEVELS_PAGE_SIZE, LEVELS_MAX_PAGE_SIZE)
+    levels = [level async for level in db.iter_levels(after, limit, selected)]
+    
+    # Page pleine: il peut rester des niveaux après le dernier
+    next_after = levels[-1]["level"] if len(levels) == limit else None
+    return {"levels": levels, "count": len(levels), "next_after": next_after}
 
-@app.post("/api/levels/generate")
+
+async def stream_levels(after: Optional[int], limit: Optional[int], fields: Optional[list]):
+    """Sérialiser les niveaux au fil du curseur, par morceaux d'environ LEVELS_STREAM_CHUNK octets"""
+    chunk = []
+    size = 0
+    async for level in db.iter_levels(after, limit, fields):
+        line = json.dumps(level, separators=(",", ":")) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= LEVELS_STREAM_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield "".join(chunk)
+
+@app.post("/api/levels/generate", status_code=202)
 async def generate_levels(count: int = 35, save: bool = True):
-    """Générer des niveaux aléatoires"""
-    levels = level_generator.generate_multiple_levels(count)
-    if save:
-        for level in levels:
-            await db.save_level(level)
-        # Sauvegarder aussi en JSON
-        level_generator.save_levels_to_json(levels, "levels.json")
-    return {"message": f"{count} niveaux générés", "levels": levels}
+    """Lancer la génération de niveaux aléatoires (suivi via GET /api/levels/generate/{job_id})"""
+    if not 1 <= count <= level_jobs.max_count:
+        raise HTTPException(status_code=400,
+                            detail=f"count doit être entre 1 et {level_jobs.max_count}")
+    job = level_jobs.submit(count, save)
+    return {"message": f"Génération de {count} niveaux lancée", **job.to_dict()}
+
+@app.get("/api/levels/generate/{job_id}")
+async def get_generation_job(job_id: str):
+    """Progression, tentatives et durées d'une génération (et ses niveaux si save=false)"""
+    job = level_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job inconnu")
+    return job.to_dict()
+
+# ===== WEBSOCKET LEADERBOARD =====
+@app.websocket("/ws/leaderboard")
+async def leaderboard_websocket(websocket: WebSocket):
+    """Classement en direct: le top complet à la connexion puis à chaque changement"""
+    await websocket.accept()
+    
+    try:
+        await leaderboard_channel.subscribe(websocket)
+        while True:
+            # Rien à recevoir: on attend juste la déconnexion
+            await websocket.receive_text()
+    except Exception:
+        pass
+    finally:
+        leaderboard_channel.unsubscribe(websocket)
+
 
 # ===== WEBSOCKET GAME =====
 @app.websocket("/ws/game")
 async def game_websocket(websocket: WebSocket):
     """WebSocket principal du jeu"""
     await websocket.accept()
-    print("✅ Client connecté au jeu !")
+    log.info("client_connected", "✅ Client connecté au jeu !")
+    
+    # Encodage JSON par défaut, binaire si demandé à l'init
+    connection = GameConnection(websocket)
+    connection.start()
     
     # État du jeu
-    game_state = {
-        "user_id": None,
-        "username": None,
-        "level": 1,
-        "grid": None,
-        "player_pos": None,
-        "goal_pos": None,
-        "time_left": 30.0,
-        "collected_icy": 0,
-        "collected_gold": 0,
-        "total_icy": 0,
-        "crystals_icy": [],
-        "crystals_gold": [],
-        "crystals_red": [],
-        "game_over": False,
-        "victory": False
-    }
+    session = GameSession()
     
-    last_timer_update = time.time()
+    # Le timer est géré par l'horloge du serveur (game_clock)
+    game_clock.register(session, connection.post)
     
     try:
         while True:
-            try:
-                # Attendre un message avec timeout pour le timer
-                data = await asyncio.wait_for(
-                    websocket.receive_json(),
-                    timeout=0.1
-                )
-                
-                action = data.get('action')
+            data = await connection.receive_json()
+            
+            action = data.get('action')
+            
+            # === INITIALISATION ===
+            if action == 'init':
+                session.username = data.get('username')
+                session.user_id = data.get('user_id')
+                connection.negotiate(data.get('encoding'))
+                log.info("player_joined", "🎮 Joueur connecté", username=session.username)
                 
-                # === INITIALISATION ===
-                if action == 'init':
-                    game_state["username"] = data.get('username')
-                    game_state["user_id"] = data.get('user_id')
-                    print(f"🎮 Joueur connecté: {game_state['username']}")
+                # Charger ou générer le niveau
+                await load_level(connection, session, 1)
+            
+            # === MOUVEMENT ===
+            elif action == 'move':
+                if not session.active:
+                    continue
                     
-                    # Charger ou générer le niveau
-                    await load_level(websocket, game_state, 1)
-                
-                # === MOUVEMENT ===
-                elif action == 'move':
-                    if game_state["game_over"] or game_state["victory"]:
-                        continue
-                        
-                    direction = data.get('direction')
-                    await handle_move(websocket, game_state, direction, db)
-                
-                # === REJOUER ===
-                elif action == 'restart':
-                    game_state["game_over"] = False
-                    game_state["victory"] = False
-                    game_state["collected_icy"] = 0
-                    game_state["collected_gold"] = 0
-                    await load_level(websocket, game_state, game_state["level"])
+                direction = data.get('direction')
+                start = time.perf_counter()
+                await handle_move(connection, session, direction, db)
+                MOVE_SECONDS.observe(time.perf_counter() - start)
+            
+            # === MOUVEMENTS GROUPÉS ===
+            elif action == 'moves':
+                moves = data.get('moves')
+                # Seule une liste est acceptée (un dict ferait planter, une chaîne serait lue lettre à lettre)
+                if not session.active or not isinstance(moves, list):
+                    continue
                 
-                # === NIVEAU SUIVANT ===
-                elif action == 'next_level':
-                    game_state["game_over"] = False
-                    game_state["victory"] = False
-                    game_state["collected_icy"] = 0
-                    game_state["collected_gold"] = 0
-                    next_level = game_state["level"] + 1
-                    if next_level > 35:
-                        next_level = 1  # Recommencer
-                    await load_level(websocket, game_state, next_level)
-                    
-            except asyncio.TimeoutError:
-                # Mettre à jour le timer
-                if game_state["grid"] is not None and not game_state["game_over"] and not game_state["victory"]:
-                    current_time = time.time()
-                    elapsed = current_time - last_timer_update
-                    last_timer_update = current_time
-                    
-                    game_state["time_left"] -= elapsed
-                    
-                    if game_state["time_left"] <= 0:
-                        game_state["time_left"] = 0
-                        game_state["game_over"] = True
-                        print("⏰ Temps écoulé ! Game Over")
-                        await websocket.send_json({
-                            "type": "game_over",
-                            "time_left": 0,
-                            "message": "Temps écoulé !"
-                        })
-                    else:
-                        # Envoyer mise à jour timer toutes les 100ms
-                        await websocket.send_json({
-                            "type": "timer_update",
-                            "time_left": game_state["time_left"]
-                        })
+                start = time.perf_counter()
+                await handle_moves(connection, session, moves)
+                MOVES_SECONDS.observe(time.perf_counter() - start)
+            
+            # === RESYNCHRONISATION DE LA GRILLE ===
+            elif action == 'resync':
+                if session.loaded:
+                    await send_grid_sync(connection, session)
+            
+            # === REJOUER ===
+            elif action == 'restart':
+                await load_level(connection, session, session.level)
+            
+            # === NIVEAU SUIVANT ===
+            elif action == 'next_level':
+                next_level = session.level + 1
+                if next_level > 35:
+                    next_level = 1  # Recommencer
+                await load_level(connection, session, next_level)
                         
     except Exception as e:
-        print(f"❌ Erreur WebSocket: {e}")
+        log.warning("ws_error", "❌ Erreur WebSocket", username=session.username, error=repr(e))
     finally:
-        print("👋 Client déconnecté")
+        game_clock.unregister(session)
+        await connection.close()
+        log.info("client_disconnected", "👋 Client déconnecté", username=session.username)
 
 
-async def load_level(websocket: WebSocket, game_state: dict, level_num: int):
+async def load_level(websocket: GameConnection, session: GameSession, level_num: int):
     """Charger un niveau"""
-    # Essayer de charger depuis la DB ou générer
-    level_data = await db.get_level(level_num)
+    start = time.perf_counter()
+    
+    # Essayer de charger depuis le cache / la DB ou générer
+    level_data = await level_cache.get(level_num, db.get_level)
     
     if not level_data:
-        # Générer un nouveau niveau
-        level_data = level_generator.generate_level(difficulty=min(level_num, 10))
+        # Prendre un niveau pré-généré dans la réserve
+        level_data = await level_pool.get(min(level_num, 10))
         level_data["level"] = level_num
         await db.save_level(level_data)
+        response_cache.invalidate("/api/levels")
+        level_cache.put(level_num, level_data)
     
-    game_state["level"] = level_num
-    game_state["grid"] = level_data["grid"]
-    game_state["player_pos"] = level_data["player_pos"]
-    game_state["goal_pos"] = level_data["goal_pos"]
-    game_state["time_left"] = level_data.get("time_limit", 30.0)
-    game_state["total_icy"] = level_data.get("total_icy", 0)
-    game_state["crystals_icy"] = level_data.get("crystals_icy", [])
-    game_state["crystals_gold"] = level_data.get("crystals_gold", [])
-    game_state["crystals_red"] = level_data.get("crystals_red", [])
-    game_state["collected_icy"] = 0
-    game_state["collected_gold"] = 0
-    game_state["game_over"] = False
-    game_state["victory"] = False
+    # La session copie la grille dans son propre bytearray
+    session.load(level_data, level_num)
+    game_clock.start_timer(session, session.time_left)
     
     # Envoyer l'état initial
     await websocket.send_json({
         "type": "init",
-        "grid": game_state["grid"],
-        "player_pos": game_state["player_pos"],
-        "goal_pos": game_state["goal_pos"],
-        "time_left": game_state["time_left"],
-        "level": game_state["level"],
-        "total_icy": game_state["total_icy"],
+        "grid": session.grid(),
+        "grid_rev": session.grid_rev,
+        "player_pos": session.player_pos,
+        "goal_pos": session.goal_pos,
+        "time_left": session.time_left,
+        "level": session.level,
+        "total_icy": session.total_icy,
         "collected_icy": 0,
         "collected_gold": 0
     })
-    print(f"📤 Niveau {level_num} envoyé")
+    metrics.LOAD_LEVEL_SECONDS.observe(time.perf_counter() - start)
+    log.info("level_sent", "📤 Niveau envoyé", level=level_num, username=session.username)
 
 
-async def handle_move(websocket: WebSocket, game_state: dict, direction: str, db: Database):
-    """Gérer le mouvement du joueur"""
-    dx, dy = 0, 0
-    if direction == 'up':
-        dy = -1
-    elif direction == 'down':
-        dy = 1
-    elif direction == 'left':
-        dx = -1
-    elif direction == 'right':
-        dx = 1
-    
-    new_x = game_state["player_pos"][0] + dx
-    new_y = game_state["player_pos"][1] + dy
-    grid = game_state["grid"]
+async def send_grid_sync(websocket: GameConnection, session: GameSession):
+    """Renvoyer la grille complète (le client a détecté un trou dans les révisions)"""
+    await websocket.send_json({
+        "type": "grid_sync",
+        "grid": session.grid(),
+        "grid_rev": session.grid_rev,
+        "player_pos": session.player_pos,
+        "collected_icy": session.collected_icy,
+        "collected_gold": session.collected_gold
+    })
+
+
+# Directions acceptées -> (dx, dy)
+DIRECTIONS = {'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+
+# Nombre maximum de mouvements traités par frame 'moves'
+MAX_BATCH_MOVES = 64
+
+CRYSTAL_TYPES = {GOLD: "gold", ICY: "icy", RED: "red"}
+
+
+def apply_move(session: GameSession, direction: str) -> int:
+    """Appliquer un déplacement (règles dans GameSession.step) et tenir l'horloge à jour"""
+    dx, dy = DIRECTIONS.get(direction, (0, 0))
+    outcome = session.step(dx, dy, game_clock.now())
     
-    # Vérifier les limites
-    if not (0 <= new_x < len(grid[0]) and 0 <= new_y < len(grid)):
-        return
+    if outcome == GOLD:
+        log.debug("crystal_collected", "🏆 Crystal Gold collecté", crystal="gold",
+                  total=session.collected_gold)
+    elif outcome == ICY:
+        log.debug("crystal_collected", "💎 Crystal Icy collecté", crystal="icy",
+                  collected=session.collected_icy, total=session.total_icy)
+    elif outcome == RED:
+        # La pénalité a avancé la deadline
+        game_clock.reschedule(session)
+        if log.enabled(logging.DEBUG):
+            log.debug("crystal_collected", "⚠️ Crystal Red ! -3 secondes", crystal="red",
+                      time_left=round(game_clock.time_left(session), 1))
+    elif outcome in (VICTORY, RED_GAME_OVER):
+        game_clock.stop_timer(session)
     
-    cell = grid[new_y][new_x]
+    return outcome
+
+
+async def save_victory(session: GameSession):
+    """Sauvegarder les gold dans le leaderboard"""
+    if session.username:
+        await leaderboard.record(
+            session.username,
+            session.collected_gold
+        )
+    log.info("victory", "🎉 Victoire !", username=session.username, level=session.level,
+             gold=session.collected_gold)
+
+
+def victory_message(session: GameSession) -> str:
+    return f"Niveau {session.level} terminé !"
+
+
+def need_crystals_message(session: GameSession) -> str:
+    return f"Collectez tous les cristaux bleus ! ({session.collected_icy}/{session.total_icy})"
+
+
+async def handle_move(websocket: GameConnection, session: GameSession, direction: str, db: Storage):
+    """Gérer le mouvement du joueur"""
+    outcome = apply_move(session, direction)
     
-    # Vérifier si c'est un mur (1, 2, 3)
-    if cell in [1, 2, 3]:
+    if outcome == BLOCKED:
         return
     
-    # Vérifier si c'est le goal
-    if [new_x, new_y] == game_state["goal_pos"]:
-        if game_state["collected_icy"] >= game_state["total_icy"]:
-            # VICTOIRE !
-            game_state["victory"] = True
-            game_state["player_pos"] = [new_x, new_y]
-            
-            # Sauvegarder les gold dans le leaderboard
-            if game_state["username"]:
-                await db.update_user_gold(
-                    game_state["username"],
-                    game_state["collected_gold"]
-                )
-            
-            await websocket.send_json({
-                "type": "victory",
-                "message": f"Niveau {game_state['level']} terminé !",
-                "total_gold": game_state["collected_gold"],
-                "player_pos": game_state["player_pos"]
-            })
-            print(f"🎉 Victoire ! Gold: {game_state['collected_gold']}")
-            return
-        else:
-            # Pas assez de cristaux icy
-            await websocket.send_json({
-                "type": "need_crystals",
-                "message": f"Collectez tous les cristaux bleus ! ({game_state['collected_icy']}/{game_state['total_icy']})"
-            })
-            return
-    
-    # Déplacer le joueur
-    game_state["player_pos"] = [new_x, new_y]
-    
-    # Vérifier collecte de cristaux
-    if cell == 4:  # Crystal Gold
-        game_state["collected_gold"] += 1
-        grid[new_y][new_x] = 0  # Retirer le cristal
-        print(f"🏆 Crystal Gold collecté ! Total: {game_state['collected_gold']}")
+    if outcome == MOVED:
+        # Mouvement normal
         await websocket.send_json({
-            "type": "crystal_collected",
-            "crystal_type": "gold",
-            "collected_gold": game_state["collected_gold"],
-            "player_pos": game_state["player_pos"],
-            "grid": grid
+            "type": "update",
+            "player_pos": session.player_pos,
+            "time_left": game_clock.time_left(session),
+            "valid": True
         })
-        
-    elif cell == 5:  # Crystal Icy (obligatoire)
-        game_state["collected_icy"] += 1
-        grid[new_y][new_x] = 0  # Retirer le cristal
-        print(f"💎 Crystal Icy collecté ! {game_state['collected_icy']}/{game_state['total_icy']}")
+    
+    elif outcome == VICTORY:
+        await save_victory(session)
         await websocket.send_json({
-            "type": "crystal_collected",
-            "crystal_type": "icy",
-            "collected_icy": game_state["collected_icy"],
-            "total_icy": game_state["total_icy"],
-            "player_pos": game_state["player_pos"],
-            "grid": grid
+            "type": "victory",
+            "message": victory_message(session),
+            "total_gold": session.collected_gold,
+            "player_pos": session.player_pos
         })
-        
-    elif cell == 6:  # Crystal Red (malus)
-        game_state["time_left"] -= 3.0
-        grid[new_y][new_x] = 0  # Retirer le cristal
-        print(f"⚠️ Crystal Red ! -3 secondes. Temps restant: {game_state['time_left']:.1f}s")
-        
-        if game_state["time_left"] <= 0:
-            game_state["time_left"] = 0
-            game_state["game_over"] = True
-            await websocket.send_json({
-                "type": "game_over",
-                "time_left": 0,
-                "message": "Le cristal rouge vous a fait perdre !"
-            })
-            return
-            
+    
+    elif outcome == NEED_CRYSTALS:
         await websocket.send_json({
-            "type": "crystal_collected",
-            "crystal_type": "red",
-            "time_left": game_state["time_left"],
-            "player_pos": game_state["player_pos"],
-            "grid": grid,
-            "message": "-3 secondes !"
+            "type": "need_crystals",
+            "message": need_crystals_message(session)
         })
-    else:
-        # Mouvement normal
+    
+    elif outcome == RED_GAME_OVER:
         await websocket.send_json({
-            "type": "update",
-            "player_pos": game_state["player_pos"],
-            "time_left": game_state["time_left"],
-            "valid": True
+            "type": "game_over",
+            "time_left": 0,
+            "message": "Le cristal rouge vous a fait perdre !"
         })
+    
+    else:
+        # Cristal ramassé: delta de grille (révision + cellule modifiée)
+        message = {
+            "type": "crystal_collected",
+            "crystal_type": CRYSTAL_TYPES[outcome],
+            "player_pos": session.player_pos,
+            "grid_rev": session.grid_rev,
+            "changes": [session.last_change_cell()]
+        }
+        if outcome == GOLD:
+            message["collected_gold"] = session.collected_gold
+        elif outcome == ICY:
+            message["collected_icy"] = session.collected_icy
+            message["total_icy"] = session.total_icy
+        else:
+            message["time_left"] = game_clock.time_left(session)
+            message["message"] = "-3 secondes !"
+        await websocket.send_json(message)
+
+
+async def handle_moves(websocket: GameConnection, session: GameSession, moves: list):
+    """
+    Appliquer une séquence de mouvements (mêmes règles que handle_move)
+    et répondre par un seul message agrégé
+    Chaque mouvement est une direction ou {"direction": ..., "t": horodatage client}
+    """
+    base_rev = session.grid_rev
+    changes = []
+    events = []
+    applied = 0
+    last_t = None
+    
+    for move in moves[:MAX_BATCH_MOVES]:
+        if not session.active:
+            break
+        
+        if isinstance(move, dict):
+            direction, t = move.get("direction"), move.get("t")
+        else:
+            direction, t = move, None
+        
+        outcome = apply_move(session, direction)
+        applied += 1
+        if t is not None:
+            last_t = t
+        
+        if outcome in (BLOCKED, MOVED):
+            continue
+        
+        if outcome in CRYSTAL_TYPES or outcome == RED_GAME_OVER:
+            changes.append(session.last_change_cell())
+        
+        if outcome == VICTORY:
+            events.append({"type": "victory", "message": victory_message(session),
+                           "total_gold": session.collected_gold})
+        elif outcome == NEED_CRYSTALS:
+            events.append({"type": "need_crystals", "message": need_crystals_message(session)})
+        elif outcome == RED_GAME_OVER:
+            events.append({"type": "game_over", "message": "Le cristal rouge vous a fait perdre !"})
+        elif outcome == RED:
+            events.append({"type": "crystal_collected", "crystal_type": "red",
+                           "message": "-3 secondes !"})
+        else:
+            events.append({"type": "crystal_collected", "crystal_type": CRYSTAL_TYPES[outcome]})
+    
+    if session.victory:
+        await save_victory(session)
+    
+    await websocket.send_json({
+        "type": "moves_result",
+        "applied": applied,
+        "last_t": last_t,
+        "player_pos": session.player_pos,
+        "time_left": game_clock.time_left(session),
+        "collected_icy": session.collected_icy,
+        "collected_gold": session.collected_gold,
+        "total_icy": session.total_icy,
+        "base_rev": base_rev,
+        "grid_rev": session.grid_rev,
+        "changes": changes,
+        "events": events,
+        "victory": session.victory,
+        "game_over": session.game_over
+    })
 
 
 if __name__ == "__main__":
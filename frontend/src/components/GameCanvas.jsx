@@ -17,6 +17,7 @@ const getWebSocketUrl = () => {
 
 const BACKEND_URL = getBackendUrl();
 const WS_URL = getWebSocketUrl();
+const LEADERBOARD_WS_URL = WS_URL.replace(/\/ws\/game$/, '/ws/leaderboard');
 
 // Composant Leaderboard intégré
 function Leaderboard({ onClose }) {
@@ -24,8 +25,23 @@ function Leaderboard({ onClose }) {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
+  // Classement en direct: le serveur pousse le top à chaque changement
   useEffect(() => {
-    fetchLeaderboard();
+    const ws = new WebSocket(LEADERBOARD_WS_URL);
+
+    ws.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'leaderboard') {
+        setLeaderboard(data.leaderboard || []);
+        setError('');
+        setLoading(false);
+      }
+    };
+
+    // Sans WebSocket, on retombe sur une lecture HTTP
+    ws.onerror = () => fetchLeaderboard();
+
+    return () => ws.close();
   }, []);
 
   const fetchLeaderboard = async () => {
@@ -110,10 +126,22 @@ function Leaderboard({ onClose }) {
   );
 }
 
+// Appliquer des changements [x, y, valeur] sans modifier la grille d'origine
+function applyGridChanges(grid, changes) {
+  const next = grid.slice();
+  for (const [x, y, value] of changes) {
+    if (next[y] === grid[y]) next[y] = grid[y].slice();
+    next[y][x] = value;
+  }
+  return next;
+}
+
 // Composant principal GameCanvas
 function GameCanvas({ user, onLogout }) {
   const canvasRef = useRef(null);
   const wsRef = useRef(null);
+  const gridRevRef = useRef(0);
+  const pendingMovesRef = useRef([]);
   const [gameState, setGameState] = useState(null);
   const [connected, setConnected] = useState(false);
   const [images, setImages] = useState({});
@@ -158,13 +186,29 @@ function GameCanvas({ user, onLogout }) {
     });
   }, []);
 
-  // Envoyer un mouvement à Python
-  const sendMove = (direction) => {
-    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
-      wsRef.current.send(JSON.stringify({
+  // Envoyer les mouvements à Python: les touches d'une même frame partent ensemble
+  const flushMoves = () => {
+    const moves = pendingMovesRef.current;
+    pendingMovesRef.current = [];
+    const ws = wsRef.current;
+    if (!moves.length || !ws || ws.readyState !== WebSocket.OPEN) return;
+
+    if (moves.length === 1) {
+      ws.send(JSON.stringify({
         action: 'move',
-        direction: direction
+        direction: moves[0].direction
       }));
+    } else {
+      ws.send(JSON.stringify({ action: 'moves', moves }));
+    }
+  };
+
+  const sendMove = (direction) => {
+    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+      pendingMovesRef.current.push({ direction, t: Math.round(performance.now()) });
+      if (pendingMovesRef.current.length === 1) {
+        requestAnimationFrame(flushMoves);
+      }
     }
   };
 
@@ -214,6 +258,7 @@ function GameCanvas({ user, onLogout }) {
       const data = JSON.parse(event.data);
 
       if (data.type === 'init') {
+        gridRevRef.current = data.grid_rev ?? 0;
         setGameState(data);
       } else if (data.type === 'update') {
         setGameState(prev => ({
@@ -232,12 +277,54 @@ function GameCanvas({ user, onLogout }) {
           time_left: data.time_left
         }));
       } else if (data.type === 'crystal_collected') {
+        // Delta de grille: on l'applique seulement s'il suit la révision connue
+        const inSync = data.changes && data.grid_rev === gridRevRef.current + 1;
+        if (inSync) {
+          gridRevRef.current = data.grid_rev;
+        } else if (!data.grid) {
+          ws.send(JSON.stringify({ action: 'resync' }));
+        }
         setGameState(prev => ({
           ...prev,
+          player_pos: data.player_pos ?? prev.player_pos,
           collected_icy: data.collected_icy ?? prev.collected_icy,
           collected_gold: data.collected_gold ?? prev.collected_gold,
           time_left: data.time_left ?? prev.time_left,
-          grid: data.grid || prev.grid
+          grid: inSync ? applyGridChanges(prev.grid, data.changes) : (data.grid || prev.grid)
+        }));
+      } else if (data.type === 'moves_result') {
+        // Réponse agrégée à une frame 'moves'
+        const inSync = data.base_rev === gridRevRef.current;
+        if (inSync) {
+          gridRevRef.current = data.grid_rev;
+        } else {
+          ws.send(JSON.stringify({ action: 'resync' }));
+        }
+        const ending = data.events.find(e => e.type === 'victory' || e.type === 'game_over');
+        setGameState(prev => ({
+          ...prev,
+          player_pos: data.player_pos,
+          time_left: data.time_left,
+          collected_icy: data.collected_icy,
+          collected_gold: data.collected_gold,
+          grid: inSync ? applyGridChanges(prev.grid, data.changes) : prev.grid,
+          victory: data.victory || prev.victory,
+          game_over: data.game_over || prev.game_over,
+          total_gold: data.victory ? data.collected_gold : prev.total_gold,
+          message: ending ? ending.message : prev.message
+        }));
+        const needCrystals = data.events.find(e => e.type === 'need_crystals');
+        if (needCrystals && !data.victory) {
+          alert(needCrystals.message || 'Collecte tous les cristaux bleus d\'abord !');
+        }
+      } else if (data.type === 'grid_sync') {
+        gridRevRef.current = data.grid_rev;
+        setGameState(prev => ({
+          ...prev,
+          grid: data.grid,
+          player_pos: data.player_pos ?? prev.player_pos,
+          collected_icy: data.collected_icy ?? prev.collected_icy,
+          collected_gold: data.collected_gold ?? prev.collected_gold
         }));
       } else if (data.type === 'game_over') {
         setGameState(prev => ({
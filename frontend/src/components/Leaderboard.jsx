@@ -5,8 +5,23 @@ function Leaderboard({ onClose }) {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
+  // Classement en direct: le serveur pousse le top à chaque changement
   useEffect(() => {
-    fetchLeaderboard();
+    const ws = new WebSocket('ws://localhost:8000/ws/leaderboard');
+
+    ws.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'leaderboard') {
+        setLeaderboard(data.leaderboard || []);
+        setError('');
+        setLoading(false);
+      }
+    };
+
+    // Sans WebSocket, on retombe sur une lecture HTTP
+    ws.onerror = () => fetchLeaderboard();
+
+    return () => ws.close();
   }, []);
 
   const fetchLeaderboard = async () => {